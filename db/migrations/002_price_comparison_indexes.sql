@@ -0,0 +1,11 @@
+-- MetalLedger v0 — Indexes for the dealer price comparison hot path
+-- PostgreSQL 15+
+--
+-- get_price_comparison() filters prices_raw by metal + 30-day price_ts window
+-- and joins active dealers by ZIP prefix (indexed in 005_dealers_zip3.sql).
+-- CONCURRENTLY so this can be applied to a live database without blocking writes.
+
+-- Covering index: metal/window scan + DISTINCT ON (dealer_id) without heap fetches
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prices_raw_metal_ts_dealer
+    ON prices_raw (metal, price_ts DESC, dealer_id)
+    INCLUDE (price_per_lb, price_per_ton, unit, source);
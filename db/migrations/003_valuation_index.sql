@@ -0,0 +1,10 @@
+-- MetalLedger v0 — Covering index for get_valuation()
+-- PostgreSQL 15+
+--
+-- The valuation lookup is "latest canonical price for metal on or before a
+-- date" (ORDER BY price_ts DESC LIMIT 1). INCLUDE lets it answer from the
+-- index alone.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prices_canonical_metal_ts
+    ON prices_canonical (metal, price_ts DESC)
+    INCLUDE (value, source);
@@ -0,0 +1,13 @@
+-- MetalLedger v0 — Enforce journal balance in the database
+-- PostgreSQL 15+
+--
+-- Attaches check_journal_balance() (001_schema.sql) as a deferred constraint
+-- trigger, so sum(debit) = sum(credit) is verified per entry at COMMIT, after
+-- all of the entry's lines have been written.
+
+DROP TRIGGER IF EXISTS trg_journal_balance_check ON journal_lines;
+
+CREATE CONSTRAINT TRIGGER trg_journal_balance_check
+    AFTER INSERT OR UPDATE ON journal_lines
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION check_journal_balance();
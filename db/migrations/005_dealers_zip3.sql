@@ -0,0 +1,13 @@
+-- MetalLedger v0 — Precomputed ZIP prefix for dealer proximity lookups
+-- PostgreSQL 15+
+--
+-- get_price_comparison() matches dealers on the 3-digit ZIP prefix. A stored
+-- generated column turns that into an equality lookup instead of LIKE 'xxx%'.
+
+ALTER TABLE dealers
+    ADD COLUMN IF NOT EXISTS location_zip3 CHAR(3)
+    GENERATED ALWAYS AS (substring(location_zip, 1, 3)) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dealers_zip3_active
+    ON dealers (location_zip3)
+    WHERE active;
@@ -0,0 +1,20 @@
+-- MetalLedger v0 — Materialized rolling median for ingest outlier detection
+-- PostgreSQL 15+
+--
+-- Every ingest tick needs one median per metal over the last 7 days
+-- (ROLLING_MEDIAN_DAYS). Precomputing it server-side means a tick reads one row
+-- per metal instead of every canonical price in the window. The pricing
+-- ingestor refreshes the view on every tick, so the window keeps sliding even
+-- when no new prices arrive. The 7-day window is fixed here; the ingestor
+-- refuses to start if ROLLING_MEDIAN_DAYS is set to anything else.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS prices_canonical_rolling_median_7d AS
+SELECT metal,
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY value) AS median_value
+FROM prices_canonical
+WHERE price_ts >= NOW() - INTERVAL '7 days'
+GROUP BY metal;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are never blocked)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_canonical_rolling_median_7d_metal
+    ON prices_canonical_rolling_median_7d (metal);
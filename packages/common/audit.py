@@ -10,15 +10,27 @@ Each entry contains:
   - actor:      role string ("HUMAN", "agent", API key role, etc.)
   - action:     short verb/noun describing what happened
   - payload_hash: SHA256 hex of the serialised payload
+
+Services that call start_audit_batcher(pool) at startup get concurrent
+write_audit_entry_async() calls written together with one COPY; callers
+still return only once their row is committed. Background loops that must
+not wait on the audit write can use write_audit_entry_nowait() instead.
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
+
+from common.batching import BatchWriter
+from common.config import AUDIT_BATCH_MAX_ROWS, AUDIT_BATCH_WAIT_MS
+from common.logging_util import get_logger
+
+log = get_logger(__name__)
 
 
 def _sha256(payload: Any) -> str:
@@ -66,6 +78,12 @@ def write_audit_entry_sync(
 
 # ─── Async DB writer (for FastAPI services that use asyncpg) ──────────────────
 
+_SQL_INSERT_AUDIT = """
+    INSERT INTO audit_log (request_id, actor, action, payload_hash)
+    VALUES ($1, $2, $3, $4)
+"""
+
+
 async def write_audit_entry_async(
     pool: Any,
     *,
@@ -85,13 +103,143 @@ async def write_audit_entry_async(
         payload:    Any JSON-serialisable object.  Its hash is stored.
     """
     payload_hash = _sha256(payload)
+    if _batcher is not None and _batcher.pool is pool:
+        await _batcher.submit((str(request_id), actor, action, payload_hash))
+        return
+    async with pool.acquire() as conn:
+        await conn.execute(
+            _SQL_INSERT_AUDIT, str(request_id), actor, action, payload_hash,
+        )
+
+
+async def write_audit_entry_nowait(
+    pool: Any,
+    *,
+    request_id: uuid.UUID,
+    actor:       str,
+    action:      str,
+    payload:     Any,
+) -> None:
+    """
+    Queue an audit entry without waiting for it to be committed.
+
+    With a batcher running for `pool` the row is handed to it and this returns
+    immediately; a failed write is logged, not raised. Without one it falls
+    back to write_audit_entry_async() and waits as usual.
+    """
+    if _batcher is not None and _batcher.pool is pool:
+        _batcher.submit_nowait((str(request_id), actor, action, _sha256(payload)))
+        return
+    await write_audit_entry_async(
+        pool, request_id=request_id, actor=actor, action=action, payload=payload,
+    )
+
+
+_AUDIT_COLUMNS = ["request_id", "actor", "action", "payload_hash"]
+
+_AuditRow = Tuple[str, str, str, str]
+
+
+class AuditBatcher(BatchWriter[_AuditRow, None]):
+    """
+    Coalesce concurrent audit_log inserts into one COPY per burst.
+
+    Each caller still waits until its row is committed, so an audit write
+    that returns has been persisted exactly as with a direct INSERT; the
+    batcher only shares the round-trip and commit between callers whose
+    rows are queued together. A lone row is written immediately.
+    """
+
+    _label = "Audit"
+
+    def __init__(
+        self,
+        pool:       Any,
+        max_rows:   int   = AUDIT_BATCH_MAX_ROWS,
+        max_wait_s: float = AUDIT_BATCH_WAIT_MS / 1000.0,
+    ) -> None:
+        super().__init__(max_rows, max_wait_s)
+        self.pool = pool
+
+    def submit_nowait(self, row: _AuditRow) -> "asyncio.Future[None]":
+        """Queue a row without waiting for its commit; failures are logged."""
+        fut = super().submit_nowait(row)
+        fut.add_done_callback(_log_unawaited_failure)
+        return fut
+
+    async def _write_batch(self, rows: List[_AuditRow]) -> List[None]:
+        async with self.pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                "audit_log", records=rows, columns=_AUDIT_COLUMNS,
+            )
+        return [None] * len(rows)
+
+    async def _write_one(self, row: _AuditRow) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(_SQL_INSERT_AUDIT, *row)
+
+
+def _log_unawaited_failure(fut: asyncio.Future) -> None:
+    if not fut.cancelled() and fut.exception() is not None:
+        log.error("Queued audit entry was not written: %s", fut.exception())
+
+
+_batcher: Optional[AuditBatcher] = None
+
+
+def start_audit_batcher(pool: Any) -> None:
+    """Route write_audit_entry_async() calls for `pool` through an AuditBatcher."""
+    global _batcher
+    _batcher = AuditBatcher(pool)
+    _batcher.start()
+
+
+async def stop_audit_batcher() -> None:
+    """Flush pending audit rows and go back to direct inserts."""
+    global _batcher
+    if _batcher is None:
+        return
+    batcher, _batcher = _batcher, None
+    await batcher.stop()
+
+
+async def write_audit_and_policy_async(
+    pool: Any,
+    *,
+    request_id: uuid.UUID,
+    actor:       str,
+    action:      str,
+    payload:     Any,
+    result:      str,
+    reason:      Optional[str] = None,
+) -> None:
+    """
+    Write an audit entry and its matching policy_events row in one statement.
+
+    Used by policy gates, which record both for every decision; the CTE keeps
+    it to a single round-trip and both rows commit (or fail) together.
+
+    Args:
+        pool:       asyncpg connection pool.
+        request_id: UUID identifying the current request.
+        actor:      Who is performing the action.
+        action:     Short description.
+        payload:    Any JSON-serialisable object.  Its hash is stored.
+        result:     Policy decision: 'ALLOWED' | 'DENIED' | 'ERROR'.
+        reason:     Why the decision was made (None when allowed).
+    """
+    payload_hash = _sha256(payload)
     async with pool.acquire() as conn:
         await conn.execute(
             """
-            INSERT INTO audit_log (request_id, actor, action, payload_hash)
-            VALUES ($1, $2, $3, $4)
+            WITH a AS (
+                INSERT INTO audit_log (request_id, actor, action, payload_hash)
+                VALUES ($1, $2, $3, $4)
+            )
+            INSERT INTO policy_events (action, actor, result, reason)
+            VALUES ($3, $2, $5, $6)
             """,
-            str(request_id), actor, action, payload_hash,
+            str(request_id), actor, action, payload_hash, result, reason,
         )
 
 
@@ -0,0 +1,143 @@
+"""
+MetalLedger — Coalescing write queue shared by the audit and journal batchers.
+
+Callers submit one item each and await its own result. A background flusher
+takes whatever is already queued and writes it in one batch. A lone item on
+an idle service is written at once; only when others were already waiting
+does the flusher linger up to max_wait_s for the batch to fill. Items that
+arrive during a write are picked up by the next one.
+
+Subclasses implement _write_batch() and _write_one(). If a batch write
+fails, every item is retried on its own, so one bad item only fails its
+own caller.
+
+    class AuditBatcher(BatchWriter[_AuditRow, None]):
+        _label = "Audit"
+        async def _write_batch(self, items): ...
+        async def _write_one(self, item): ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+from common.logging_util import get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchWriter(Generic[T, R]):
+    """Coalesce concurrent single-item writes into batched writes."""
+
+    # Names the batch in the fallback warning ("Audit batch of 3 failed ...")
+    _label = "Write"
+
+    def __init__(self, max_items: int, max_wait_s: float) -> None:
+        self._max_items  = max_items
+        self._max_wait_s = max_wait_s
+        self._queue: "asyncio.Queue[Optional[Tuple[T, asyncio.Future]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush anything still queued, then stop the flusher."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for it to be written; returns its result."""
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    def submit_nowait(self, item: T) -> "asyncio.Future[R]":
+        """Queue an item without waiting; the returned future settles on write."""
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, fut))
+        return fut
+
+    # ── To implement ──────────────────────────────────────────────────────────
+
+    async def _write_batch(self, items: List[T]) -> List[R]:
+        """Write all items in one go; return one result per item, in order."""
+        raise NotImplementedError
+
+    async def _write_one(self, item: T) -> R:
+        """Write a single item (fallback after a failed batch)."""
+        raise NotImplementedError
+
+    # ── Flusher ───────────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        loop    = asyncio.get_running_loop()
+        stopped = False
+        while not stopped:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch   = [first]
+            stopped = self._drain(batch)
+            # A lone item (idle service) is written at once. Only when others
+            # were already queued is it worth lingering for the batch to fill.
+            if len(batch) > 1:
+                deadline = loop.time() + self._max_wait_s
+                while not stopped and len(batch) < self._max_items:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        pending = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if pending is None:
+                        stopped = True
+                        break
+                    batch.append(pending)
+                    stopped = self._drain(batch)
+            await self._flush(batch)
+
+    def _drain(self, batch: List[Tuple[T, asyncio.Future]]) -> bool:
+        """Move already-queued items into batch; True if the stop sentinel was seen."""
+        while len(batch) < self._max_items:
+            try:
+                pending = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return False
+            if pending is None:
+                return True
+            batch.append(pending)
+        return False
+
+    async def _flush(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        try:
+            results = await self._write_batch([item for item, _ in batch])
+        except Exception as exc:
+            # One bad item must not fail the items batched alongside it:
+            # retry each on its own.
+            log.warning(
+                "%s batch of %d failed (%s); retrying individually",
+                self._label, len(batch), exc,
+            )
+            for item, fut in batch:
+                try:
+                    result = await self._write_one(item)
+                except Exception as item_exc:
+                    if not fut.done():
+                        fut.set_exception(item_exc)
+                else:
+                    if not fut.done():
+                        fut.set_result(result)
+            return
+
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
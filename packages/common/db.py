@@ -0,0 +1,65 @@
+"""
+MetalLedger — Process-wide asyncpg connection pool.
+
+Every component in a process (ingest loop, dealer submission router, any
+adapter that writes) should share one pool rather than creating its own:
+separate pools each keep idle connections open and each pay the cold
+connect cost after idling.
+
+    from common.db import get_pool, close_pool
+    pool = await get_pool()
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Optional
+
+import asyncpg
+
+from common.config import (
+    DATABASE_URL,
+    POOL_MAX_INACTIVE_LIFETIME,
+    POOL_MAX_QUERIES,
+    POOL_MAX_SIZE,
+    POOL_MIN_SIZE,
+    POOL_STATEMENT_CACHE_SIZE,
+)
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def get_pool(**overrides: Any) -> asyncpg.Pool:
+    """
+    Return the shared pool, creating it on first call.
+
+    `overrides` are passed to asyncpg.create_pool() (e.g. min_size/max_size)
+    and only take effect on the call that creates the pool.
+    """
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            kwargs: dict = {
+                "min_size":                         POOL_MIN_SIZE,
+                "max_size":                         POOL_MAX_SIZE,
+                "max_queries":                      POOL_MAX_QUERIES,
+                "max_inactive_connection_lifetime": POOL_MAX_INACTIVE_LIFETIME,
+                "statement_cache_size":             POOL_STATEMENT_CACHE_SIZE,
+            }
+            kwargs.update(overrides)
+            _pool = await asyncpg.create_pool(DATABASE_URL, **kwargs)
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the shared pool (process shutdown). Safe to call if never opened."""
+    global _pool
+    if _pool is None:
+        return
+    pool, _pool = _pool, None
+    await pool.close()
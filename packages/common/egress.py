@@ -9,7 +9,6 @@ Allowlist: ["metals-api.com", "api.lbma.org.uk"]
 
 from __future__ import annotations
 
-import urllib.parse
 from typing import Any, Dict, Optional
 
 import httpx
@@ -19,6 +18,10 @@ from common.config import EGRESS_ALLOWLIST
 # Re-export for convenience so callers can `from common.egress import ALLOWLIST`
 ALLOWLIST: list[str] = EGRESS_ALLOWLIST
 
+# Built once at import: lookups walk the host's parent domains against this
+# set, so cost scales with the number of labels, not the allowlist length.
+_ALLOWED_HOSTS: frozenset[str] = frozenset(a.lower() for a in ALLOWLIST)
+
 
 class EgressViolation(Exception):
     """Raised when a caller attempts to reach a domain not on the allowlist."""
@@ -32,25 +35,69 @@ class EgressViolation(Exception):
         )
 
 
-def _extract_domain(url: str) -> str:
-    """Return the netloc (host) component of a URL, stripping 'www.'."""
-    parsed = urllib.parse.urlparse(url)
-    host   = parsed.netloc or parsed.path          # handle protocol-less URLs
-    # Strip port if present
-    host = host.split(":")[0]
-    # Normalise: remove leading 'www.'
+def extract_host(url: str) -> str:
+    """
+    Return the lowercased host of a URL, without port or leading 'www.'.
+
+    Plain str.partition/split rather than urlparse: only the authority is
+    needed. Cutting at the first '/', '?' or '#' means a query string like
+    '?x.allowed.com' can never be mistaken for the host.
+    """
+    _, sep, rest = url.partition("://")
+    if not sep:
+        rest = url                              # handle protocol-less URLs
+    for delim in "/?#":
+        rest = rest.partition(delim)[0]
+    host = rest.partition(":")[0].lower()       # strip port if present
     if host.startswith("www."):
         host = host[4:]
-    return host.lower()
+    return host
+
+
+def is_allowed_host(host: str) -> bool:
+    """
+    True if `host` (lowercased, 'www.' stripped) is on the allowlist or is a
+    subdomain of an allowlisted domain.
+
+    Tries the host itself, then each parent ("a.b.c" → "b.c" → "c").
+    """
+    while True:
+        if host in _ALLOWED_HOSTS:
+            return True
+        _, dot, host = host.partition(".")
+        if not dot:
+            return False
+
+
+# One client for all egress calls in the process, so repeated fetches to the
+# same host reuse kept-alive connections instead of a new TCP+TLS handshake
+# each time. Created on first use; per-call timeouts are passed on each
+# request.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def aclose_egress_client() -> None:
+    """Close the shared egress client (process shutdown)."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
 
 
 def _check_allowlist(url: str) -> None:
     """Raise EgressViolation if the URL's domain is not allowed."""
-    domain = _extract_domain(url)
-    for allowed in ALLOWLIST:
-        if domain == allowed or domain.endswith("." + allowed):
-            return
-    raise EgressViolation(url, domain)
+    domain = extract_host(url)
+    if not is_allowed_host(domain):
+        raise EgressViolation(url, domain)
 
 
 async def egress_get(
@@ -68,8 +115,7 @@ async def egress_get(
         httpx.HTTPError: on network / HTTP errors
     """
     _check_allowlist(url)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        return await client.get(url, params=params, headers=headers)
+    return await _get_client().get(url, params=params, headers=headers, timeout=timeout)
 
 
 async def egress_post(
@@ -88,5 +134,6 @@ async def egress_post(
         httpx.HTTPError: on network / HTTP errors
     """
     _check_allowlist(url)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        return await client.post(url, json=json, data=data, headers=headers)
+    return await _get_client().post(
+        url, json=json, data=data, headers=headers, timeout=timeout,
+    )
@@ -6,6 +6,7 @@ Updated: Scrap metal pivot — DealerPriceOut, scrap Metal enum.
 from __future__ import annotations
 
 import enum
+from dataclasses import dataclass, fields
 from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
@@ -57,7 +58,24 @@ class ForecastModel(str, enum.Enum):
 
 # ── Pricing ───────────────────────────────────────────────────────────────────
 
-class PricePoint(BaseModel):
+class _PricePointCache:
+    # Derived, not a dataclass field: kept out of fields()/asdict()/repr/eq.
+    __slots__ = ("value_f",)
+
+
+@dataclass(slots=True, kw_only=True, frozen=True)
+class PricePoint(_PricePointCache):
+    """
+    One price observation as emitted by an ingest adapter.
+
+    A slotted dataclass rather than a Pydantic model: adapters build one per
+    (source, metal) every tick and always pass already-typed values, so
+    per-instance validation and __dict__ storage were pure overhead.
+
+    `value_f` is `value` as a float, converted once at construction for the
+    normalizer's outlier comparison. Instances are frozen, so it can never
+    drift from `value`.
+    """
     source:   str
     metal:    str
     venue:    str     = ""
@@ -66,6 +84,15 @@ class PricePoint(BaseModel):
     currency: str     = "USD"
     source_id: Optional[str] = None
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "value_f", float(self.value))
+
+    def __setstate__(self, state: list) -> None:
+        # copy/pickle restore only the fields; re-derive value_f like __init__
+        for f, v in zip(fields(self), state):
+            object.__setattr__(self, f.name, v)
+        self.__post_init__()
+
 
 class CanonicalPrice(BaseModel):
     metal:       str
@@ -11,8 +11,9 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
 
@@ -145,6 +146,9 @@ async def run_forecast(
             except Exception as exc:
                 log.error("Model %s/%s failed: %s", model_name, metal, exc)
 
+    if all_results:
+        _invalidate_pq_cache()
+
     await write_audit_entry_async(
         pool,
         request_id = request_id,
@@ -246,6 +250,65 @@ _SYNTHETIC_PRICES = {
     "AL_EXTRUSION": (0.57, 0.9344, "ALI=F", 0.61),
 }
 
+# Metals /forecast/live can price (live feed and synthetic share the same map).
+_VALID_METALS = frozenset(_SYNTHETIC_PRICES)
+
+# Ensemble bands per metal, as (cached_at, bands).  POST /forecast/run in this
+# process drops the cache at once; the TTL bounds staleness when forecasts are
+# stored by another worker or process.  Keys are limited to _VALID_METALS, so
+# the cache never holds more than one entry per metal.
+_PQ_CACHE_TTL_SECONDS = 60.0
+_PQ_CACHE: Dict[str, Tuple[float, Tuple[dict, dict, dict]]] = {}
+
+
+def _invalidate_pq_cache() -> None:
+    """Drop cached /forecast/live bands after new forecasts are stored."""
+    _PQ_CACHE.clear()
+
+
+def _get_pq(rows, target_horizon: int) -> dict:
+    """Get median ensemble P10/P50/P90 for a given horizon, or extrapolate."""
+    # Exact match
+    exact = [r for r in rows if r["horizon"] == target_horizon]
+    if exact:
+        p50s = [float(r["p50"]) for r in exact if r["p50"] is not None]
+        p10s = [float(r["p10"]) for r in exact if r["p10"] is not None]
+        p90s = [float(r["p90"]) for r in exact if r["p90"] is not None]
+        return {
+            "p10": round(sum(p10s)/len(p10s), 6) if p10s else None,
+            "p50": round(sum(p50s)/len(p50s), 6) if p50s else None,
+            "p90": round(sum(p90s)/len(p90s), 6) if p90s else None,
+        }
+
+    # Extrapolate from nearest stored horizon (closest to target)
+    if not rows:
+        return {"p10": None, "p50": None, "p90": None}
+
+    stored_horizons = sorted({r["horizon"] for r in rows})
+    nearest = min(stored_horizons, key=lambda h: abs(h - target_horizon))
+    base_rows = [r for r in rows if r["horizon"] == nearest]
+    if not base_rows:
+        return {"p10": None, "p50": None, "p90": None}
+
+    p50s = [float(r["p50"]) for r in base_rows if r["p50"] is not None]
+    p10s = [float(r["p10"]) for r in base_rows if r["p10"] is not None]
+    p90s = [float(r["p90"]) for r in base_rows if r["p90"] is not None]
+    if not p50s:
+        return {"p10": None, "p50": None, "p90": None}
+
+    base_p50 = sum(p50s) / len(p50s)
+    scale = (target_horizon / nearest) ** 0.5  # spread grows with √time
+
+    base_p10 = sum(p10s)/len(p10s) if p10s else base_p50 * 0.95
+    base_p90 = sum(p90s)/len(p90s) if p90s else base_p50 * 1.05
+    half_spread = (base_p90 - base_p10) / 2
+
+    return {
+        "p10": round(base_p50 - half_spread * scale, 6),
+        "p50": round(base_p50, 6),
+        "p90": round(base_p50 + half_spread * scale, 6),
+    }
+
 
 @router.get(
     "/forecast/live",
@@ -268,6 +331,14 @@ async def get_live_forecast(
     from datetime import timezone
     request_id = new_request_id()
     metal_upper = metal.upper()
+    now_iso     = datetime.now(timezone.utc).isoformat()
+
+    # Reject unknown metals before touching the price feed or the DB
+    if metal_upper not in _VALID_METALS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown metal: {metal}",
+        )
 
     # ── 1. Fetch live price ───────────────────────────────────────────────────
     live_meta  = None
@@ -285,84 +356,37 @@ async def get_live_forecast(
 
     # Synthetic fallback
     if live_meta is None:
-        synth = _SYNTHETIC_PRICES.get(metal_upper)
-        if synth:
-            scrap_p, raw_p, ticker, spread = synth
-            live_meta = {
-                "metal_slug":        metal_upper,
-                "scrap_price":       scrap_p,
-                "raw_futures_price": raw_p,
-                "ticker":            ticker,
-                "spread_factor":     spread,
-                "fetched_at":        datetime.now(timezone.utc).isoformat(),
-            }
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Unknown metal: {metal}",
-            )
+        scrap_p, raw_p, ticker, spread = _SYNTHETIC_PRICES[metal_upper]
+        live_meta = {
+            "metal_slug":        metal_upper,
+            "scrap_price":       scrap_p,
+            "raw_futures_price": raw_p,
+            "ticker":            ticker,
+            "spread_factor":     spread,
+            "fetched_at":        now_iso,
+        }
 
     # ── 2. Pull latest forecast rows from DB ──────────────────────────────────
     # We want the ensemble P50 at horizons 30, 90, 180 days.
     # Horizons stored are 1, 5, 20 — we extrapolate from the closest stored horizon
     # for now (20-day P50/P10/P90 scaled by √(horizon/20) for spread).
-    rows = await pool.fetch(
-        """
-        SELECT DISTINCT ON (model, horizon)
-            model, horizon, p10, p50, p90
-        FROM forecasts
-        WHERE metal = $1
-        ORDER BY model, horizon, run_at DESC
-        """,
-        metal_upper,
-    )
-
-    def _get_pq(target_horizon: int) -> dict:
-        """Get median ensemble P10/P50/P90 for a given horizon, or extrapolate."""
-        # Exact match
-        exact = [r for r in rows if r["horizon"] == target_horizon]
-        if exact:
-            p50s = [float(r["p50"]) for r in exact if r["p50"] is not None]
-            p10s = [float(r["p10"]) for r in exact if r["p10"] is not None]
-            p90s = [float(r["p90"]) for r in exact if r["p90"] is not None]
-            return {
-                "p10": round(sum(p10s)/len(p10s), 6) if p10s else None,
-                "p50": round(sum(p50s)/len(p50s), 6) if p50s else None,
-                "p90": round(sum(p90s)/len(p90s), 6) if p90s else None,
-            }
-
-        # Extrapolate from nearest stored horizon (closest to target)
-        if not rows:
-            return {"p10": None, "p50": None, "p90": None}
-
-        stored_horizons = sorted({r["horizon"] for r in rows})
-        nearest = min(stored_horizons, key=lambda h: abs(h - target_horizon))
-        base_rows = [r for r in rows if r["horizon"] == nearest]
-        if not base_rows:
-            return {"p10": None, "p50": None, "p90": None}
-
-        p50s = [float(r["p50"]) for r in base_rows if r["p50"] is not None]
-        p10s = [float(r["p10"]) for r in base_rows if r["p10"] is not None]
-        p90s = [float(r["p90"]) for r in base_rows if r["p90"] is not None]
-        if not p50s:
-            return {"p10": None, "p50": None, "p90": None}
-
-        base_p50 = sum(p50s) / len(p50s)
-        scale = (target_horizon / nearest) ** 0.5  # spread grows with √time
-
-        base_p10 = sum(p10s)/len(p10s) if p10s else base_p50 * 0.95
-        base_p90 = sum(p90s)/len(p90s) if p90s else base_p50 * 1.05
-        half_spread = (base_p90 - base_p10) / 2
-
-        return {
-            "p10": round(base_p50 - half_spread * scale, 6),
-            "p50": round(base_p50, 6),
-            "p90": round(base_p50 + half_spread * scale, 6),
-        }
-
-    pq_30  = _get_pq(30)
-    pq_90  = _get_pq(90)
-    pq_180 = _get_pq(180)
+    cached = _PQ_CACHE.get(metal_upper)
+    if cached is not None and time.monotonic() - cached[0] < _PQ_CACHE_TTL_SECONDS:
+        bands = cached[1]
+    else:
+        rows = await pool.fetch(
+            """
+            SELECT DISTINCT ON (model, horizon)
+                model, horizon, p10, p50, p90
+            FROM forecasts
+            WHERE metal = $1
+            ORDER BY model, horizon, run_at DESC
+            """,
+            metal_upper,
+        )
+        bands = (_get_pq(rows, 30), _get_pq(rows, 90), _get_pq(rows, 180))
+        _PQ_CACHE[metal_upper] = (time.monotonic(), bands)
+    pq_30, pq_90, pq_180 = bands
 
     await write_audit_entry_async(
         pool,
@@ -389,5 +413,5 @@ async def get_live_forecast(
         p50_180d          = pq_180["p50"],
         p90_180d          = pq_180["p90"],
         price_source      = price_source,
-        generated_at      = datetime.now(timezone.utc).isoformat(),
+        generated_at      = now_iso,
     )
@@ -13,6 +13,7 @@ import asyncpg
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from common.audit import start_audit_batcher, stop_audit_batcher
 from common.config import DATABASE_URL
 from common.logging_util import get_logger
 from endpoints import router
@@ -43,6 +44,7 @@ async def startup():
                 DATABASE_URL, min_size=1, max_size=10
             )
             log.info("Forecast service connected to database")
+            start_audit_batcher(app.state.pool)
             return
         except Exception as exc:
             import asyncio
@@ -53,6 +55,7 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
+    await stop_audit_batcher()
     if hasattr(app.state, "pool"):
         await app.state.pool.close()
 
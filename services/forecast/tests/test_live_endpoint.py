@@ -14,12 +14,16 @@ Verifies:
   5. Unknown metal returns 404
   6. Response includes P10/P50/P90 at 30, 90, 180 days
   7. Forecasts fall back to None when no stored forecasts
+  8. Band cache (real endpoints module): cleared by POST /forecast/run,
+     other processes' writes visible once the TTL lapses
 """
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
+import types
 from datetime import datetime, timezone, date
 from typing import Dict, List, Optional
 from unittest.mock import MagicMock, patch
@@ -32,6 +36,8 @@ from pydantic import BaseModel
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
 
+import endpoints
+
 
 # ── In-memory DB mock ─────────────────────────────────────────────────────────
 
@@ -102,6 +108,7 @@ SYNTHETIC_PRICES = {
     "AL_CAST": (0.48, 0.9231, "ALI=F", 0.52),
     "AL_EXTRUSION": (0.57, 0.9344, "ALI=F", 0.61),
 }
+VALID_METALS = frozenset(SYNTHETIC_PRICES)
 
 
 class LiveForecastResponse(BaseModel):
@@ -177,31 +184,29 @@ def build_test_app(
     async def get_live_forecast(metal: str, request: Request):
         pool = request.app.state.pool
         metal_upper = metal.upper()
+        now_iso     = datetime.now(timezone.utc).isoformat()
+        if metal_upper not in VALID_METALS:
+            raise HTTPException(status_code=404, detail=f"Unknown metal: {metal}")
 
         # Price: use provided live_meta or fall back to synthetic
         if live_meta and live_meta.get("metal_slug") == metal_upper:
             price_data   = live_meta
             price_source = "live"
         else:
-            synth = SYNTHETIC_PRICES.get(metal_upper)
-            if synth:
-                scrap_p, raw_p, ticker, spread = synth
-                price_data = {
-                    "metal_slug": metal_upper,
-                    "scrap_price": scrap_p,
-                    "raw_futures_price": raw_p,
-                    "ticker": ticker,
-                    "spread_factor": spread,
-                    "fetched_at": datetime.now(timezone.utc).isoformat(),
-                }
-                price_source = "synthetic"
-            else:
-                raise HTTPException(status_code=404, detail=f"Unknown metal: {metal}")
-
+            scrap_p, raw_p, ticker, spread = SYNTHETIC_PRICES[metal_upper]
+            price_data = {
+                "metal_slug": metal_upper,
+                "scrap_price": scrap_p,
+                "raw_futures_price": raw_p,
+                "ticker": ticker,
+                "spread_factor": spread,
+                "fetched_at": now_iso,
+            }
+            price_source = "synthetic"
+
+        # Band caching is exercised against the real endpoint (TestForecastBandCache)
         rows = await pool.fetch("SELECT FROM forecasts WHERE metal=$1", metal_upper)
-        pq_30  = _get_pq(rows, 30)
-        pq_90  = _get_pq(rows, 90)
-        pq_180 = _get_pq(rows, 180)
+        pq_30, pq_90, pq_180 = _get_pq(rows, 30), _get_pq(rows, 90), _get_pq(rows, 180)
 
         return LiveForecastResponse(
             metal_slug        = price_data["metal_slug"],
@@ -220,7 +225,7 @@ def build_test_app(
             p50_180d          = pq_180["p50"],
             p90_180d          = pq_180["p90"],
             price_source      = price_source,
-            generated_at      = datetime.now(timezone.utc).isoformat(),
+            generated_at      = now_iso,
         )
 
     return app, db
@@ -286,6 +291,13 @@ class TestLiveEndpointShape:
         assert "generated_at" in data
         assert data["generated_at"] is not None
 
+    def test_synthetic_fetched_at_matches_generated_at(self):
+        """Synthetic responses share one timestamp for fetched_at and generated_at."""
+        resp = self.client.get("/forecast/live?metal=CU_BARE")
+        data = resp.json()
+        assert data["price_source"] == "synthetic"
+        assert data["fetched_at"] == data["generated_at"]
+
     def test_p50_at_30d_is_positive(self):
         resp = self.client.get("/forecast/live?metal=CU_BARE")
         data = resp.json()
@@ -372,3 +384,98 @@ class TestForecastFallback:
         assert data["p50_30d"] is not None
         assert data["p50_90d"] is not None
         assert data["p50_180d"] is not None
+
+
+# ── Band cache: real endpoints module ─────────────────────────────────────────
+
+class _ForecastStore:
+    """Fake pool for endpoints.py: forecasts table + CU_BARE canonical prices."""
+
+    def __init__(self, forecasts: List[Dict]):
+        self.forecasts      = list(forecasts)
+        self.forecast_reads = 0
+
+    async def fetch(self, query: str, metal: str):
+        if "FROM forecasts" in query:
+            self.forecast_reads += 1
+            return [r for r in self.forecasts if r["metal"] == metal]
+        if "FROM prices_canonical" in query and metal == "CU_BARE":
+            return [{"price_date": date(2024, 1, d), "value": 4.0} for d in range(1, 11)]
+        return []
+
+    async def fetchval(self, query: str, model, metal, horizon, p10, p50, p90):
+        self.forecasts.append({"metal": metal, "model": model, "horizon": horizon,
+                               "p10": p10, "p50": p50, "p90": p90})
+        return len(self.forecasts)
+
+
+def _fake_model(p50: float) -> types.ModuleType:
+    mod = types.ModuleType("fake_model")
+    mod.run = lambda prices, horizons: {
+        h: {"p10": p50 - 0.2, "p50": p50, "p90": p50 + 0.2} for h in horizons
+    }
+    return mod
+
+
+class TestForecastBandCache:
+    """The real _PQ_CACHE: TTL, clear on POST /forecast/run."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        async def no_audit(*args, **kwargs):
+            pass
+
+        feed = types.ModuleType("data.commodity_feed")
+        feed.get_latest_price_with_meta = lambda metal: None     # synthetic price
+        monkeypatch.setitem(sys.modules, "data.commodity_feed", feed)
+
+        models = types.ModuleType("models")
+        models.naive = models.arima_model = models.gradient_boost = _fake_model(5.0)
+        monkeypatch.setitem(sys.modules, "models", models)
+
+        self.clock = 1000.0
+        monkeypatch.setattr(endpoints, "time", types.SimpleNamespace(monotonic=lambda: self.clock))
+        monkeypatch.setattr(endpoints, "write_audit_entry_async", no_audit)
+        monkeypatch.setattr(endpoints, "_PQ_CACHE", {})
+
+        self.store = _ForecastStore([
+            {"metal": "CU_BARE", "model": "naive", "horizon": 20,
+             "p10": 3.80, "p50": 4.00, "p90": 4.20},
+        ])
+
+    def live(self, metal: str = "CU_BARE"):
+        return asyncio.run(endpoints.get_live_forecast(metal, request=None, pool=self.store))
+
+    def test_repeat_request_skips_db_fetch(self):
+        """Polling the same metal reuses cached bands instead of re-querying."""
+        first  = self.live()
+        second = self.live()
+        assert self.store.forecast_reads == 1
+        assert first.p50_30d == second.p50_30d
+
+    def test_forecast_run_clears_cache(self):
+        """POST /forecast/run in this process makes the next request re-read."""
+        before = self.live()
+        result = asyncio.run(endpoints.run_forecast(request=None, pool=self.store))
+        assert result["forecasts_created"] > 0
+
+        after = self.live()
+        assert self.store.forecast_reads == 2
+        assert after.p50_30d > before.p50_30d
+
+    def test_write_from_other_process_visible_after_ttl(self):
+        """Forecasts stored by another worker are picked up once the TTL lapses."""
+        before = self.live()
+
+        # Another process's write: no in-process invalidation happens
+        self.store.forecasts.append({"metal": "CU_BARE", "model": "arima", "horizon": 20,
+                                     "p10": 4.80, "p50": 5.00, "p90": 5.20})
+        self.clock += endpoints._PQ_CACHE_TTL_SECONDS - 1
+        stale = self.live()
+        assert stale.p50_30d == before.p50_30d
+        assert self.store.forecast_reads == 1
+
+        self.clock += 1
+        fresh = self.live()
+        assert self.store.forecast_reads == 2
+        assert fresh.p50_30d > before.p50_30d
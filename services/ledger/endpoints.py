@@ -24,7 +24,6 @@ from common.logging_util import get_logger
 from common.types import AccountOut, JournalEntryIn, JournalEntryOut, ValuationOut
 
 from models import (
-    create_journal_entry,
     get_journal_entry,
     get_valuation,
     list_accounts,
@@ -39,6 +38,10 @@ def get_pool(request: Request):
     return request.app.state.pool
 
 
+def get_journal_queue(request: Request):
+    return request.app.state.journal_queue
+
+
 # ── POST /journal_entries ─────────────────────────────────────────────────────
 
 @router.post(
@@ -52,6 +55,7 @@ async def create_entry(
     request:    Request,
     x_api_role: Optional[str] = Header(None, alias="X-API-Role"),
     pool=Depends(get_pool),
+    journal_queue=Depends(get_journal_queue),
 ):
     """
     Create a double-entry journal entry.
@@ -77,10 +81,10 @@ async def create_entry(
             detail      = "Only HUMAN role may create journal entries. Agent access denied.",
         )
 
-    # Balance is already validated by Pydantic; catching DB-level recheck
+    # Balance is already validated by Pydantic; catching DB-level recheck.
+    # The write is batched with concurrent entries by the journal queue.
     try:
-        entry_id = await create_journal_entry(
-            pool,
+        entry_id = await journal_queue.submit(
             entry_date = payload.entry_date,
             memo       = payload.memo,
             created_by = x_api_role,
@@ -210,12 +214,18 @@ async def compare_prices(
     """
     request_id = new_request_id()
 
-    results = await get_price_comparison(
-        pool,
-        metal        = metal.upper().strip(),
-        zip_code     = zip.strip(),
-        radius_miles = radius_miles,
-    )
+    try:
+        results = await get_price_comparison(
+            pool,
+            metal        = metal.strip().upper(),
+            zip_code     = zip.strip(),
+            radius_miles = radius_miles,
+        )
+    except ValueError as exc:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail      = str(exc),
+        )
 
     await write_audit_entry_async(
         pool,
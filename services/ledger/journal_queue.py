@@ -0,0 +1,73 @@
+"""
+MetalLedger — Ledger service journal write queue.
+
+POST /journal_entries submits entries here instead of opening its own
+transaction. A background flusher coalesces whatever is queued (up to
+JOURNAL_BATCH_MAX_ENTRIES, lingering at most JOURNAL_BATCH_WAIT_MS for more
+under load) into one transaction, so commit/fsync cost is paid once per
+batch rather than once per entry. A lone entry is flushed immediately.
+Each caller still awaits its own entry id. The flush loop itself is
+common.batching.BatchWriter, shared with the audit batcher.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from datetime import date
+from typing import Any, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
+
+from common.batching import BatchWriter
+from common.config import JOURNAL_BATCH_MAX_ENTRIES, JOURNAL_BATCH_WAIT_MS
+from common.types import JournalLineIn
+
+from models import check_balance, create_journal_entries_batch, create_journal_entry
+
+_Entry = Tuple[date, Optional[str], str, List[JournalLineIn]]
+
+
+class JournalWriteQueue(BatchWriter[_Entry, int]):
+    """Coalesce concurrent journal entry writes into batched transactions."""
+
+    _label = "Journal"
+
+    def __init__(
+        self,
+        pool:        Any,
+        max_entries: int   = JOURNAL_BATCH_MAX_ENTRIES,
+        max_wait_s:  float = JOURNAL_BATCH_WAIT_MS / 1000.0,
+    ) -> None:
+        super().__init__(max_entries, max_wait_s)
+        self._pool = pool
+
+    async def submit(
+        self,
+        *,
+        entry_date: date,
+        memo:       Optional[str],
+        created_by: str,
+        lines:      List[JournalLineIn],
+    ) -> int:
+        """
+        Queue an entry and wait for it to be committed.
+
+        Raises ValueError immediately for an unbalanced entry (nothing is
+        queued). Returns the new entry id.
+        """
+        check_balance(lines)
+        return await super().submit((entry_date, memo, created_by, lines))
+
+    async def _write_batch(self, entries: List[_Entry]) -> List[int]:
+        return await create_journal_entries_batch(self._pool, entries)
+
+    async def _write_one(self, entry: _Entry) -> int:
+        entry_date, memo, created_by, lines = entry
+        return await create_journal_entry(
+            self._pool,
+            entry_date = entry_date,
+            memo       = memo,
+            created_by = created_by,
+            lines      = lines,
+        )
@@ -13,9 +13,18 @@ import asyncpg
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from common.config import DATABASE_URL
+from common.audit import start_audit_batcher, stop_audit_batcher
+from common.config import (
+    DATABASE_URL,
+    POOL_MAX_INACTIVE_LIFETIME,
+    POOL_MAX_QUERIES,
+    POOL_MAX_SIZE,
+    POOL_MIN_SIZE,
+    POOL_STATEMENT_CACHE_SIZE,
+)
 from common.logging_util import get_logger
 from endpoints import router
+from journal_queue import JournalWriteQueue
 
 log = get_logger("ledger")
 
@@ -40,9 +49,20 @@ async def startup():
     for attempt in range(10):
         try:
             app.state.pool = await asyncpg.create_pool(
-                DATABASE_URL, min_size=1, max_size=10
+                DATABASE_URL,
+                min_size                         = POOL_MIN_SIZE,
+                max_size                         = POOL_MAX_SIZE,
+                max_queries                      = POOL_MAX_QUERIES,
+                max_inactive_connection_lifetime = POOL_MAX_INACTIVE_LIFETIME,
+                statement_cache_size             = POOL_STATEMENT_CACHE_SIZE,
+            )
+            log.info(
+                "Ledger service connected to database (pool %d-%d)",
+                POOL_MIN_SIZE, POOL_MAX_SIZE,
             )
-            log.info("Ledger service connected to database")
+            app.state.journal_queue = JournalWriteQueue(app.state.pool)
+            app.state.journal_queue.start()
+            start_audit_batcher(app.state.pool)
             return
         except Exception as exc:
             import asyncio
@@ -53,6 +73,9 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
+    if hasattr(app.state, "journal_queue"):
+        await app.state.journal_queue.stop()
+    await stop_audit_batcher()
     if hasattr(app.state, "pool"):
         await app.state.pool.close()
 
@@ -9,36 +9,121 @@ Updated: Scrap metal pivot — get_price_comparison() for dealer price lookup.
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
+import time
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
 
-from common.types import AccountOut, DealerPriceOut, JournalEntryOut, JournalLineIn, ValuationOut
+from common.config import JOURNAL_SYNCHRONOUS_COMMIT
+from common.types import AccountOut, AccountType, DealerPriceOut, JournalEntryOut, JournalLineIn, Metal, ValuationOut
 
 
-# ── Accounts ──────────────────────────────────────────────────────────────────
+# ── Hot-path SQL ──────────────────────────────────────────────────────────────
+# Read queries are module constants so the exact same text reaches asyncpg on
+# every call; its per-connection statement cache (sized on the pool) then
+# keeps them prepared and the parse/plan step drops off the hot path.
 
-async def list_accounts(pool: Any) -> List[AccountOut]:
-    rows = await pool.fetch(
-        "SELECT id, code, name, type, currency, active FROM accounts ORDER BY code"
+_SQL_LIST_ACCOUNTS = (
+    "SELECT id, code, name, type, currency, active FROM accounts ORDER BY code"
+)
+
+_SQL_GET_ACCOUNT = (
+    "SELECT id, code, name, type, currency, active FROM accounts WHERE id = $1"
+)
+
+# DISTINCT ON keeps each dealer's best price; the outer ORDER BY ranks dealers.
+_SQL_PRICE_COMPARISON = """
+    SELECT * FROM (
+        SELECT DISTINCT ON (d.id)
+            d.id::text          AS dealer_id,
+            d.name              AS dealer_name,
+            d.location_zip,
+            d.city,
+            d.state,
+            p.metal,
+            p.price_per_lb,
+            p.price_per_ton,
+            p.unit,
+            p.price_ts,
+            p.source
+        FROM prices_raw p
+        JOIN dealers d ON d.id = p.dealer_id
+        WHERE
+            p.metal       = $1
+            AND d.active  = TRUE
+            AND p.price_ts >= NOW() - INTERVAL '30 days'
+            AND d.location_zip3 = $2
+        ORDER BY d.id, p.price_per_lb DESC NULLS LAST
+    ) best
+    ORDER BY price_per_lb DESC NULLS LAST
+"""
+
+# Latest canonical price + open inventory in one round-trip; no row when the
+# metal has no price on or before the date. The price_ts bound is a plain
+# range (not price_ts::date) so the (metal, price_ts DESC) index stops at LIMIT 1.
+_SQL_VALUATION = """
+    WITH pr AS (
+        SELECT value, source, price_ts
+        FROM prices_canonical
+        WHERE metal = $1 AND price_ts < ($2::date + INTERVAL '1 day')
+        ORDER BY price_ts DESC
+        LIMIT 1
+    ), qty AS (
+        SELECT COALESCE(SUM(quantity), 0) AS total_qty
+        FROM inventory_lots
+        WHERE metal = $1 AND NOT closed
     )
-    return [AccountOut(**dict(r)) for r in rows]
+    SELECT pr.value, pr.source, pr.price_ts, qty.total_qty
+    FROM pr, qty
+"""
 
 
-async def get_account(pool: Any, account_id: int) -> Optional[Dict]:
-    row = await pool.fetchrow(
-        "SELECT id, code, name, type, currency, active FROM accounts WHERE id = $1",
-        account_id,
+# ── Accounts ──────────────────────────────────────────────────────────────────
+
+def _account_from_row(r: Any) -> AccountOut:
+    # Positional access follows the id, code, name, type, currency, active
+    # column order of the account queries above. Rows are already DB-typed,
+    # so Pydantic validation is skipped (only the enum is coerced).
+    return AccountOut.model_construct(
+        id       = r[0],
+        code     = r[1],
+        name     = r[2],
+        type     = AccountType(r[3]),
+        currency = r[4],
+        active   = r[5],
     )
-    return dict(row) if row else None
+
+
+async def list_accounts(pool: Any) -> List[AccountOut]:
+    rows = await pool.fetch(_SQL_LIST_ACCOUNTS)
+    return [_account_from_row(r) for r in rows]
+
+
+async def get_account(pool: Any, account_id: int) -> Optional[AccountOut]:
+    row = await pool.fetchrow(_SQL_GET_ACCOUNT, account_id)
+    return _account_from_row(row) if row else None
 
 
 # ── Journal Entries ───────────────────────────────────────────────────────────
 
+def check_balance(lines: List[JournalLineIn]) -> None:
+    """Raise ValueError unless the lines' debits equal their credits."""
+    total_debit  = Decimal(0)
+    total_credit = Decimal(0)
+    for ln in lines:
+        total_debit  += ln.debit
+        total_credit += ln.credit
+    if total_debit != total_credit:
+        raise ValueError(
+            f"Unbalanced entry: debit={total_debit} credit={total_credit}"
+        )
+
+
 async def create_journal_entry(
     pool: Any,
     *,
@@ -50,40 +135,94 @@ async def create_journal_entry(
     """
     Insert a journal entry + lines in a transaction.
     Balance check is enforced by the Pydantic model BEFORE this call,
-    and again here as a safety net.
+    again here as a safety net (so callers get a ValueError, not a DB error),
+    and finally by the deferred trg_journal_balance_check trigger at commit.
 
     Returns the new entry id.
     """
-    total_debit  = sum(ln.debit  for ln in lines)
-    total_credit = sum(ln.credit for ln in lines)
-    if total_debit != total_credit:
-        raise ValueError(
-            f"Unbalanced entry: debit={total_debit} credit={total_credit}"
-        )
+    check_balance(lines)
 
+    # Parent + lines in one statement: the lines are bound as parallel arrays
+    # and unnested against the freshly inserted entry id. asyncpg serialises
+    # statements on a connection (no gather() over one conn), so batching in
+    # SQL is how we avoid a round-trip per line.
     async with pool.acquire() as conn:
         async with conn.transaction():
+            if not JOURNAL_SYNCHRONOUS_COMMIT:
+                # Scoped to this transaction; valuations/audit keep the default
+                await conn.execute("SET LOCAL synchronous_commit = off")
             entry_id = await conn.fetchval(
                 """
-                INSERT INTO journal_entries (entry_date, memo, created_by, status)
-                VALUES ($1, $2, $3, 'POSTED')
-                RETURNING id
-                """,
-                entry_date, memo, created_by,
-            )
-            for ln in lines:
-                await conn.execute(
-                    """
+                WITH e AS (
+                    INSERT INTO journal_entries (entry_date, memo, created_by, status)
+                    VALUES ($1, $2, $3, 'POSTED')
+                    RETURNING id
+                ), l AS (
                     INSERT INTO journal_lines
                         (entry_id, account_id, debit, credit, memo)
-                    VALUES ($1, $2, $3, $4, $5)
-                    """,
-                    entry_id, ln.account_id,
-                    float(ln.debit), float(ln.credit), ln.memo,
+                    SELECT e.id, u.account_id, u.debit, u.credit, u.memo
+                    FROM e
+                    CROSS JOIN unnest($4::int[], $5::numeric[], $6::numeric[], $7::text[])
+                        AS u(account_id, debit, credit, memo)
                 )
+                SELECT id FROM e
+                """,
+                entry_date, memo, created_by,
+                [ln.account_id for ln in lines],
+                [ln.debit      for ln in lines],
+                [ln.credit     for ln in lines],
+                [ln.memo       for ln in lines],
+            )
     return entry_id
 
 
+async def create_journal_entries_batch(
+    pool: Any,
+    entries: List[Tuple[date, Optional[str], str, List[JournalLineIn]]],
+) -> List[int]:
+    """
+    Insert many (entry_date, memo, created_by, lines) entries in one
+    transaction: ids are reserved up front so lines can be COPYed in a single
+    pass. Callers must have run check_balance() on each entry.
+
+    Returns the new entry ids, in input order.
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            if not JOURNAL_SYNCHRONOUS_COMMIT:
+                await conn.execute("SET LOCAL synchronous_commit = off")
+            id_rows = await conn.fetch(
+                """
+                SELECT nextval(pg_get_serial_sequence('journal_entries', 'id'))
+                FROM generate_series(1, $1)
+                """,
+                len(entries),
+            )
+            entry_ids = [r[0] for r in id_rows]
+            await conn.execute(
+                """
+                INSERT INTO journal_entries (id, entry_date, memo, created_by, status)
+                SELECT u.id, u.entry_date, u.memo, u.created_by, 'POSTED'
+                FROM unnest($1::int[], $2::date[], $3::text[], $4::text[])
+                    AS u(id, entry_date, memo, created_by)
+                """,
+                entry_ids,
+                [e[0] for e in entries],
+                [e[1] for e in entries],
+                [e[2] for e in entries],
+            )
+            await conn.copy_records_to_table(
+                "journal_lines",
+                records = [
+                    (entry_id, ln.account_id, ln.debit, ln.credit, ln.memo)
+                    for entry_id, e in zip(entry_ids, entries)
+                    for ln in e[3]
+                ],
+                columns = ["entry_id", "account_id", "debit", "credit", "memo"],
+            )
+    return entry_ids
+
+
 async def get_journal_entry(pool: Any, entry_id: int) -> Optional[Dict]:
     row = await pool.fetchrow(
         """
@@ -97,6 +236,26 @@ async def get_journal_entry(pool: Any, entry_id: int) -> Optional[Dict]:
 
 # ── Valuations ────────────────────────────────────────────────────────────────
 
+# Short-lived cache of comparison results keyed by (metal, zip_prefix).
+# Popular metal/ZIP combos are requested far more often than dealer prices
+# change. The TTL is the only invalidation: new prices are written by the
+# ingestor (another process), so a result can lag by up to the TTL.
+# Keys are limited to known metals and 3-digit prefixes, empty results are
+# not stored, and the dict is capped (expired entries swept first, then the
+# oldest) so request traffic cannot grow it without bound.
+_PRICE_CACHE_TTL_SECONDS = 60.0
+_PRICE_CACHE_MAX_ENTRIES = 1024
+_ZERO = Decimal("0")
+_PRICE_CACHE: Dict[Tuple[str, str], Tuple[float, List[DealerPriceOut]]] = {}
+
+_VALID_METALS = frozenset(m.value for m in Metal)
+
+# Single-flight: concurrent misses for the same key share one DB query. The
+# query runs in its own task, so a cancelled caller never cancels it for the
+# others.
+_INFLIGHT: Dict[Tuple[str, str], "asyncio.Task[List[DealerPriceOut]]"] = {}
+
+
 async def get_price_comparison(
     pool: Any,
     metal: str,
@@ -118,91 +277,119 @@ async def get_price_comparison(
     Returns:
         List of DealerPriceOut sorted by price_per_lb descending.
 
+    Raises:
+        ValueError: metal is not a known slug, or zip_code does not start
+                    with 3 digits.
+
     Notes on ZIP-based proximity (v0):
         Full geo-distance requires PostGIS or a geocoding service.
         For v0, we use ZIP prefix matching:
           - Same ZIP = 0 miles (always included)
-          - Same 3-digit prefix (~county level) ≈ within ~50 miles
+          - Same 3-digit prefix (~county level) ≈ within ~50 miles,
+            matched on the generated dealers.location_zip3 column
           - Same 1-digit prefix (~region) ≈ within ~200 miles
         This is a practical approximation for the Houston-area demo dealers.
         Replace with PostGIS ST_DWithin() when geo data is available.
+
+    Non-empty results are cached in-process for _PRICE_CACHE_TTL_SECONDS per
+    (metal, ZIP prefix), so price_age_hours may lag by up to that long.
     """
-    # ZIP proximity filter: same prefix (3 digits) approximates county radius
-    zip_prefix = zip_code[:3] if len(zip_code) >= 3 else zip_code
+    # Unknown metals and short/non-numeric ZIPs can never match a dealer;
+    # reject before any cache or DB work
+    if metal not in _VALID_METALS:
+        raise ValueError(f"Unknown metal slug {metal!r}")
+    if not zip_code or len(zip_code) < 3 or not zip_code[:3].isdigit():
+        raise ValueError("zip_code must be a 5-digit ZIP")
 
-    rows = await pool.fetch(
-        """
-        SELECT
-            d.id::text          AS dealer_id,
-            d.name              AS dealer_name,
-            d.location_zip,
-            d.city,
-            d.state,
-            p.metal,
-            p.price_per_lb,
-            p.price_per_ton,
-            p.unit,
-            p.price_ts,
-            p.source
-        FROM prices_raw p
-        JOIN dealers d ON d.id = p.dealer_id
-        WHERE
-            p.metal       = $1
-            AND d.active  = TRUE
-            AND p.price_ts >= NOW() - INTERVAL '30 days'
-            AND d.location_zip LIKE $2
-        ORDER BY p.price_per_lb DESC NULLS LAST
-        """,
-        metal,
-        f"{zip_prefix}%",
-    )
+    # ZIP proximity filter: same prefix (3 digits) approximates county radius
+    zip_prefix = zip_code[:3]
+
+    key    = (metal, zip_prefix)
+    cached = _PRICE_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _PRICE_CACHE_TTL_SECONDS:
+        return list(cached[1])
+
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache(pool, metal, zip_prefix))
+        task.add_done_callback(_retrieve_exception)
+        _INFLIGHT[key] = task
+    return list(await asyncio.shield(task))
+
+
+async def _fetch_and_cache(pool: Any, metal: str, zip_prefix: str) -> List[DealerPriceOut]:
+    """Run one comparison query for get_price_comparison() and cache the result."""
+    key = (metal, zip_prefix)
+    try:
+        results = await _fetch_price_comparison(pool, metal, zip_prefix)
+        if results:
+            _cache_price_comparison(key, results)
+        return results
+    finally:
+        _INFLIGHT.pop(key, None)
+
+
+def _cache_price_comparison(key: Tuple[str, str], results: List[DealerPriceOut]) -> None:
+    now = time.monotonic()
+    _PRICE_CACHE.pop(key, None)          # re-insert so dict order is oldest-first
+    _PRICE_CACHE[key] = (now, results)
+    if len(_PRICE_CACHE) <= _PRICE_CACHE_MAX_ENTRIES:
+        return
+    for k in [k for k, (ts, _) in _PRICE_CACHE.items() if now - ts >= _PRICE_CACHE_TTL_SECONDS]:
+        del _PRICE_CACHE[k]
+    while len(_PRICE_CACHE) > _PRICE_CACHE_MAX_ENTRIES:
+        del _PRICE_CACHE[next(iter(_PRICE_CACHE))]
+
+
+def _retrieve_exception(task: "asyncio.Task") -> None:
+    # Every waiter may have been cancelled; don't log "exception never retrieved".
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch_price_comparison(
+    pool: Any,
+    metal: str,
+    zip_prefix: str,
+) -> List[DealerPriceOut]:
+    # asyncpg decodes NUMERIC straight to Decimal, so price columns are used
+    # as-is rather than round-tripped through str().
+    rows = await pool.fetch(_SQL_PRICE_COMPARISON, metal, zip_prefix)
 
     now = datetime.now(tz=timezone.utc)
     results = []
-    seen_dealers = set()
-
-    for row in rows:
-        # One price per dealer (most recent already sorted by price DESC,
-        # but we take first occurrence of each dealer = highest price)
-        dealer_id = row["dealer_id"]
-        if dealer_id in seen_dealers:
-            continue
-        seen_dealers.add(dealer_id)
-
-        price_ts = row["price_ts"]
-        if price_ts.tzinfo is None:
-            price_ts = price_ts.replace(tzinfo=timezone.utc)
 
+    # Rows arrive one per dealer, best payer first. Unpacked positionally in
+    # _SQL_PRICE_COMPARISON's column order.
+    for (
+        dealer_id, dealer_name, location_zip, city, state, row_metal,
+        price_per_lb, price_per_ton, unit, price_ts, source,
+    ) in rows:
+        # prices_raw.price_ts is TIMESTAMPTZ, so asyncpg hands back aware datetimes
         age_hours = (now - price_ts).total_seconds() / 3600.0
 
-        price_per_lb  = row["price_per_lb"]
-        price_per_ton = row["price_per_ton"]
-
-        # Fallback: compute from value column if price_per_lb not populated
+        # No per-lb price: report 0 and drop the per-ton figure with it
         if price_per_lb is None:
-            # prices_raw.value is stored as price_per_lb (normalized)
-            price_per_lb  = None
+            price_per_lb  = _ZERO
             price_per_ton = None
 
+        # Trusted DB values: construct without re-validating every field
         results.append(
-            DealerPriceOut(
+            DealerPriceOut.model_construct(
                 dealer_id      = dealer_id,
-                dealer_name    = row["dealer_name"],
-                location_zip   = row["location_zip"] or "",
-                city           = row["city"],
-                state          = row["state"],
-                metal          = row["metal"],
-                price_per_lb   = Decimal(str(price_per_lb)) if price_per_lb is not None else Decimal("0"),
-                price_per_ton  = Decimal(str(price_per_ton)) if price_per_ton is not None else None,
-                unit           = row["unit"] or "lb",
+                dealer_name    = dealer_name,
+                location_zip   = location_zip or "",
+                city           = city,
+                state          = state,
+                metal          = row_metal,
+                price_per_lb   = price_per_lb,
+                price_per_ton  = price_per_ton,
+                unit           = unit or "lb",
                 price_ts       = price_ts,
-                source         = row["source"],
+                source         = source,
                 price_age_hours = round(age_hours, 2),
             )
         )
-
-    # Sort by price_per_lb descending (best payer first)
-    results.sort(key=lambda r: r.price_per_lb, reverse=True)
     return results
 
 
@@ -222,32 +409,14 @@ async def get_valuation(
     If no canonical price exists for the exact date, walk backwards up to
     5 business days to find the most recent available price.
     """
-    # Find closest canonical price on or before valuation_date
-    price_row = await pool.fetchrow(
-        """
-        SELECT value, source, price_ts
-        FROM prices_canonical
-        WHERE metal = $1 AND price_ts::date <= $2
-        ORDER BY price_ts DESC
-        LIMIT 1
-        """,
-        metal, valuation_date,
-    )
+    # Closest canonical price on or before valuation_date + active lot total
+    row = await pool.fetchrow(_SQL_VALUATION, metal, valuation_date)
 
-    if not price_row:
+    if row is None or row["value"] is None:
         return None
 
-    # Sum active inventory lots for this metal
-    qty_row = await pool.fetchrow(
-        """
-        SELECT COALESCE(SUM(quantity), 0) AS total_qty
-        FROM inventory_lots
-        WHERE metal = $1 AND NOT closed
-        """,
-        metal,
-    )
-    quantity     = Decimal(str(qty_row["total_qty"]))
-    price        = Decimal(str(price_row["value"]))
+    quantity     = row["total_qty"]
+    price        = row["value"]
     market_value = quantity * price
 
     return ValuationOut(
@@ -256,5 +425,5 @@ async def get_valuation(
         quantity       = quantity,
         price          = price,
         market_value   = market_value,
-        source         = price_row["source"],
+        source         = row["source"],
     )
@@ -0,0 +1,99 @@
+"""
+Shared fakes for the ledger tests.
+
+FakePool stands in for an asyncpg pool on the batched write paths (journal
+write queue and audit batcher). It records every COPY and single-row write,
+and rejects any row carrying a value from `rejected` (an unknown account_id
+or actor), the way a FK or CHECK constraint would.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Tuple
+
+import pytest
+
+REJECTED = frozenset({999, "BAD"})
+
+
+def _has_rejected(values: Iterable[Any]) -> bool:
+    for v in values:
+        if isinstance(v, (list, tuple)):
+            if _has_rejected(v):
+                return True
+        elif v in REJECTED:
+            return True
+    return False
+
+
+class _FakeTransaction:
+    def __init__(self, pool: "FakePool"):
+        self._pool = pool
+
+    async def __aenter__(self):
+        self._pool.transactions += 1
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class _FakeConn:
+    def __init__(self, pool: "FakePool"):
+        self._pool = pool
+
+    def transaction(self):
+        return _FakeTransaction(self._pool)
+
+    async def execute(self, query: str, *args: Any):
+        if "INSERT INTO audit_log" in query:
+            if _has_rejected(args):
+                raise ValueError("audit_log insert rejected")
+            self._pool.single_rows.append(("audit_log", args))
+
+    async def fetch(self, query: str, *args: Any):
+        # nextval() over generate_series(1, $1): reserve ids for a batch
+        return [(self._pool.next_id(),) for _ in range(args[0])]
+
+    async def fetchval(self, query: str, *args: Any):
+        # Single journal entry insert (entry + lines in one statement)
+        if _has_rejected(args):
+            raise ValueError("journal_lines.account_id violates foreign key")
+        self._pool.single_rows.append(("journal_entries", args))
+        return self._pool.next_id()
+
+    async def copy_records_to_table(self, table: str, *, records, columns):
+        records = list(records)
+        if _has_rejected(records):
+            raise ValueError(f"{table} copy rejected")
+        self._pool.copies.append((table, records))
+
+
+class _FakeAcquire:
+    def __init__(self, pool: "FakePool"):
+        self._pool = pool
+
+    async def __aenter__(self):
+        return _FakeConn(self._pool)
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.transactions = 0
+        self.copies:      List[Tuple[str, list]]  = []
+        self.single_rows: List[Tuple[str, tuple]] = []
+        self._last_id     = 0
+
+    def next_id(self) -> int:
+        self._last_id += 1
+        return self._last_id
+
+    def acquire(self):
+        return _FakeAcquire(self)
+
+
+@pytest.fixture
+def fake_pool() -> FakePool:
+    return FakePool()
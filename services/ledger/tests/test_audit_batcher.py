@@ -0,0 +1,124 @@
+"""
+Tests for MetalLedger audit log batching (common.audit.AuditBatcher).
+
+The batching loop is covered in test_batch_writer.py; these check the
+audit-specific wiring against the shared FakePool (conftest.py).
+
+Verifies:
+1. Concurrent audit writes are committed with one COPY.
+2. A failed COPY falls back to one INSERT per row; only the bad row's
+   caller sees the error.
+3. stop_audit_batcher() flushes rows queued by write_audit_entry_nowait().
+4. A failed nowait row is logged, never raised into the caller.
+5. Writes after stop go straight to INSERT.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+
+from common import audit
+from common.audit import (
+    AuditBatcher,
+    start_audit_batcher,
+    stop_audit_batcher,
+    write_audit_entry_async,
+    write_audit_entry_nowait,
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_global_batcher():
+    audit._batcher = None
+    yield
+    audit._batcher = None
+
+
+def _write(pool, actor: str, writer=write_audit_entry_async):
+    return writer(
+        pool,
+        request_id = uuid.uuid4(),
+        actor      = actor,
+        action     = "POST /journal_entries",
+        payload    = {"actor": actor},
+    )
+
+
+def _actors(pool) -> list:
+    rows = [row for _, copy in pool.copies for row in copy]
+    rows += [args for _, args in pool.single_rows]
+    return sorted(row[1] for row in rows)
+
+
+class TestAuditBatcher:
+    def test_concurrent_writes_share_one_copy(self, fake_pool):
+        async def scenario():
+            audit._batcher = AuditBatcher(fake_pool, max_wait_s=0.0)
+            tasks = [asyncio.create_task(_write(fake_pool, f"actor{i}")) for i in range(3)]
+            await asyncio.sleep(0)          # all queued before the flusher runs
+            audit._batcher.start()
+            await asyncio.gather(*tasks)
+            await stop_audit_batcher()
+
+        asyncio.run(scenario())
+        assert [(table, len(rows)) for table, rows in fake_pool.copies] == [("audit_log", 3)]
+        assert fake_pool.single_rows == []
+
+    def test_failed_copy_falls_back_to_per_row_insert(self, fake_pool):
+        """One rejected row fails its own caller; the rest are still written."""
+        async def scenario():
+            audit._batcher = AuditBatcher(fake_pool, max_wait_s=0.0)
+            tasks = [
+                asyncio.create_task(_write(fake_pool, actor))
+                for actor in ("HUMAN", "BAD", "agent")
+            ]
+            await asyncio.sleep(0)
+            audit._batcher.start()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            await stop_audit_batcher()
+            return results
+
+        results = asyncio.run(scenario())
+        assert results[0] is None and results[2] is None
+        assert isinstance(results[1], ValueError)
+        assert fake_pool.copies == []
+        assert _actors(fake_pool) == ["HUMAN", "agent"]
+
+    def test_stop_flushes_nowait_entries(self, fake_pool):
+        async def scenario():
+            start_audit_batcher(fake_pool)
+            for i in range(5):
+                await _write(fake_pool, f"actor{i}", writer=write_audit_entry_nowait)
+            await stop_audit_batcher()
+
+        asyncio.run(scenario())
+        assert _actors(fake_pool) == [f"actor{i}" for i in range(5)]
+        assert audit._batcher is None
+
+    def test_nowait_failure_is_logged_not_raised(self, fake_pool, caplog):
+        async def scenario():
+            start_audit_batcher(fake_pool)
+            await _write(fake_pool, "BAD",   writer=write_audit_entry_nowait)
+            await _write(fake_pool, "HUMAN", writer=write_audit_entry_nowait)
+            await stop_audit_batcher()
+
+        asyncio.run(scenario())
+        assert _actors(fake_pool) == ["HUMAN"]
+        assert "not written" in caplog.text
+
+    def test_writes_after_stop_go_direct(self, fake_pool):
+        async def scenario():
+            start_audit_batcher(fake_pool)
+            await stop_audit_batcher()
+            await _write(fake_pool, "HUMAN", writer=write_audit_entry_nowait)
+
+        asyncio.run(scenario())
+        assert fake_pool.copies == []
+        assert _actors(fake_pool) == ["HUMAN"]
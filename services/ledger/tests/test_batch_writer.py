@@ -0,0 +1,107 @@
+"""
+Tests for the shared coalescing write loop (common.batching.BatchWriter),
+used by the journal write queue and the audit batcher.
+
+Verifies:
+1. Items already queued together are written as one batch.
+2. A lone item is written at once, not after the linger window.
+3. A failed batch falls back to per-item writes; only the bad item fails.
+4. stop() writes everything still queued (submit and submit_nowait alike).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from typing import List
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+
+from common.batching import BatchWriter
+
+
+class _ListWriter(BatchWriter[str, str]):
+    """Writes items to in-memory lists; the item "BAD" is always rejected."""
+
+    def __init__(self, max_items: int = 100, max_wait_s: float = 30.0) -> None:
+        super().__init__(max_items, max_wait_s)
+        self.batches: List[List[str]] = []
+        self.singles: List[str]       = []
+
+    async def _write_batch(self, items: List[str]) -> List[str]:
+        if "BAD" in items:
+            raise ValueError("batch rejected")
+        self.batches.append(items)
+        return [item.lower() for item in items]
+
+    async def _write_one(self, item: str) -> str:
+        if item == "BAD":
+            raise ValueError("item rejected")
+        self.singles.append(item)
+        return item.lower()
+
+
+class TestBatchWriter:
+    def test_queued_items_share_one_batch(self):
+        async def scenario():
+            writer = _ListWriter(max_wait_s=0.0)
+            tasks  = [asyncio.create_task(writer.submit(x)) for x in ("A", "B", "C")]
+            await asyncio.sleep(0)          # all queued before the flusher runs
+            writer.start()
+            results = await asyncio.gather(*tasks)
+            await writer.stop()
+            return writer, results
+
+        writer, results = asyncio.run(scenario())
+        assert results == ["a", "b", "c"]
+        assert writer.batches == [["A", "B", "C"]]
+
+    def test_lone_item_is_not_held_for_linger_window(self):
+        async def scenario():
+            writer = _ListWriter(max_wait_s=30.0)
+            writer.start()
+            try:
+                return await asyncio.wait_for(writer.submit("A"), timeout=1.0)
+            finally:
+                await writer.stop()
+
+        assert asyncio.run(scenario()) == "a"
+
+    def test_failed_batch_falls_back_to_single_writes(self):
+        async def scenario():
+            writer = _ListWriter(max_wait_s=0.0)
+            tasks  = [asyncio.create_task(writer.submit(x)) for x in ("A", "BAD", "C")]
+            await asyncio.sleep(0)
+            writer.start()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            await writer.stop()
+            return writer, results
+
+        writer, results = asyncio.run(scenario())
+        assert results[0] == "a" and results[2] == "c"
+        assert isinstance(results[1], ValueError)
+        assert writer.batches == []
+        assert writer.singles == ["A", "C"]
+
+    def test_stop_writes_everything_queued(self):
+        async def scenario():
+            writer  = _ListWriter(max_items=2, max_wait_s=30.0)
+            waited  = [asyncio.create_task(writer.submit(x)) for x in ("A", "B")]
+            await asyncio.sleep(0)
+            nowait  = [writer.submit_nowait(x) for x in ("C", "D", "E")]
+            writer.start()
+            await writer.stop()             # sentinel lands behind the items
+            return writer, await asyncio.gather(*waited, *nowait)
+
+        writer, results = asyncio.run(scenario())
+        assert results == ["a", "b", "c", "d", "e"]
+        assert [x for batch in writer.batches for x in batch] == ["A", "B", "C", "D", "E"]
+
+    def test_stop_without_start_is_a_no_op(self):
+        async def scenario():
+            await _ListWriter().stop()
+
+        asyncio.run(scenario())
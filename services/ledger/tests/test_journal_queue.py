@@ -0,0 +1,95 @@
+"""
+Tests for MetalLedger journal write queue (journal_queue.JournalWriteQueue).
+
+The batching loop is covered in test_batch_writer.py; these check the
+journal-specific wiring against the shared FakePool (conftest.py).
+
+Verifies:
+1. Queued entries are written in one batch transaction.
+2. An unknown account fails only its own entry (per-entry fallback).
+3. An unbalanced entry is rejected before it is queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+from typing import List
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from common.types import JournalLineIn
+
+from journal_queue import JournalWriteQueue
+
+
+def _lines(account_id: int = 1) -> List[JournalLineIn]:
+    return [
+        JournalLineIn(account_id=account_id, debit=Decimal("100.00")),
+        JournalLineIn(account_id=2,          credit=Decimal("100.00")),
+    ]
+
+
+def _submit(queue: JournalWriteQueue, account_id: int = 1) -> "asyncio.Task[int]":
+    return asyncio.create_task(queue.submit(
+        entry_date = date(2024, 1, 15),
+        memo       = None,
+        created_by = "HUMAN",
+        lines      = _lines(account_id),
+    ))
+
+
+class TestJournalWriteQueue:
+    def test_queued_entries_share_one_transaction(self, fake_pool):
+        async def scenario():
+            queue = JournalWriteQueue(fake_pool, max_wait_s=0.0)
+            tasks = [_submit(queue) for _ in range(3)]
+            await asyncio.sleep(0)          # all three queued before the flusher runs
+            queue.start()
+            ids = await asyncio.gather(*tasks)
+            await queue.stop()
+            return ids
+
+        ids = asyncio.run(scenario())
+        assert sorted(ids) == [1, 2, 3]
+        assert fake_pool.transactions == 1
+        assert [table for table, _ in fake_pool.copies] == ["journal_lines"]
+        assert len(fake_pool.copies[0][1]) == 6
+        assert fake_pool.single_rows == []
+
+    def test_failed_batch_falls_back_to_per_entry_writes(self, fake_pool):
+        """An unknown account fails only its own entry, not its batch-mates."""
+        async def scenario():
+            queue = JournalWriteQueue(fake_pool, max_wait_s=0.0)
+            tasks = [_submit(queue), _submit(queue), _submit(queue, account_id=999)]
+            await asyncio.sleep(0)
+            queue.start()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            await queue.stop()
+            return results
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(r, int) for r in results[:2])
+        assert isinstance(results[2], ValueError)
+        assert fake_pool.copies == []
+        assert len(fake_pool.single_rows) == 2
+
+    def test_unbalanced_entry_rejected_before_queueing(self, fake_pool):
+        async def scenario():
+            queue = JournalWriteQueue(fake_pool)
+            with pytest.raises(ValueError):
+                await queue.submit(
+                    entry_date = date(2024, 1, 15),
+                    memo       = None,
+                    created_by = "HUMAN",
+                    lines      = _lines()[:1],
+                )
+            return queue._queue.qsize()
+
+        assert asyncio.run(scenario()) == 0
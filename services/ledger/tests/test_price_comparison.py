@@ -14,14 +14,18 @@ Strategy: inline FastAPI test app with in-memory DB mock.
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 
 import pytest
 from fastapi import FastAPI, Request, status, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
@@ -29,6 +33,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from common.types import DealerPriceOut
 
+import models
+
 
 # ── In-memory dealer + price store ───────────────────────────────────────────
 
@@ -37,10 +43,14 @@ class InMemoryDealerDB:
     Minimal in-memory mock of dealers + prices_raw tables.
 
     Supports the queries used by get_price_comparison().
+
+    Invariant: add_dealer/add_price always write every column (city, state,
+    unit, ...), so rows are read with plain indexing, never .get().
     """
     def __init__(self):
-        self.dealers: Dict[str, Dict] = {}
-        self.prices:  List[Dict] = []
+        self.dealers:  Dict[str, Dict] = {}
+        self.prices:   List[Dict] = []
+        self.by_metal: Dict[str, List[Dict]] = defaultdict(list)
 
     def add_dealer(self, dealer_id: str, name: str, zip_code: str, city: str = "", state: str = "TX") -> None:
         self.dealers[dealer_id] = {
@@ -62,61 +72,114 @@ class InMemoryDealerDB:
         unit: str = "lb",
     ) -> None:
         ts = price_ts or datetime.now(tz=timezone.utc)
-        self.prices.append({
+        # Decimals built once here (write path), not per compare request
+        price = {
             "dealer_id":    dealer_id,
             "metal":        metal,
-            "price_per_lb": price_per_lb,
-            "price_per_ton": price_per_lb * 2000,
+            "price_per_lb": Decimal(str(price_per_lb)),
+            "price_per_ton": Decimal(str(price_per_lb * 2000)),
             "price_ts":     ts,
             "source":       source,
             "unit":         unit,
-        })
+        }
+        self.prices.append(price)
+        self.by_metal[metal].append(price)
+
+    def snapshot(self) -> None:
+        """Remember current dealers/prices so a mutating test can restore() them."""
+        self._snapshot = (
+            {k: dict(v) for k, v in self.dealers.items()},
+            list(self.prices),
+            {k: list(v) for k, v in self.by_metal.items()},
+        )
 
-    def query_compare(self, metal: str, zip_prefix: str) -> List[Dict]:
-        """Simulate the SQL query in get_price_comparison()."""
-        results = []
-        cutoff  = datetime.now(tz=timezone.utc) - timedelta(days=30)
+    def restore(self) -> None:
+        dealers, prices, by_metal = self._snapshot
+        self.dealers  = dealers
+        self.prices   = prices
+        self.by_metal = defaultdict(list, by_metal)
 
-        for price in self.prices:
-            dealer = self.dealers.get(price["dealer_id"])
-            if not dealer:
-                continue
-            if price["metal"] != metal:
-                continue
-            if not dealer["active"]:
-                continue
-            if price["price_ts"] < cutoff:
-                continue
-            dzip = dealer.get("location_zip", "")
-            if not dzip.startswith(zip_prefix):
+    def query_compare(
+        self,
+        metal:      str,
+        zip_prefix: str,
+        now:        Optional[datetime] = None,
+    ) -> List[Dict]:
+        """Simulate the SQL query in get_price_comparison()."""
+        best:    Dict[str, Dict] = {}
+        cutoff   = (now or datetime.now(tz=timezone.utc)) - timedelta(days=30)
+        dealers  = self.dealers
+
+        # Only this metal's prices (mirrors the metal-leading index), filtered
+        # to active, in-window dealers sharing the ZIP prefix
+        matches = (
+            (price, dealer)
+            for price in self.by_metal.get(metal, ())
+            if (dealer := dealers.get(price["dealer_id"])) is not None
+            and dealer["active"]
+            and price["price_ts"] >= cutoff
+            and dealer["location_zip"].startswith(zip_prefix)
+        )
+        for price, dealer in matches:
+            # Keep only each dealer's highest price (DISTINCT ON dealer)
+            cur = best.get(dealer["id"])
+            if cur is not None and price["price_per_lb"] <= cur["price_per_lb"]:
                 continue
-            results.append({**price, **{
-                "dealer_id":   dealer["id"],
-                "dealer_name": dealer["name"],
-                "location_zip": dealer["location_zip"],
-                "city":        dealer.get("city"),
-                "state":       dealer.get("state"),
-            }})
-
-        # Sort by price_per_lb DESC, dedup by dealer (first = highest)
-        results.sort(key=lambda r: r["price_per_lb"], reverse=True)
-        seen, deduped = set(), []
-        for r in results:
-            if r["dealer_id"] not in seen:
-                seen.add(r["dealer_id"])
-                deduped.append(r)
-        return deduped
+            # price["dealer_id"] already equals dealer["id"]
+            best[dealer["id"]] = dict(
+                price,
+                dealer_name  = dealer["name"],
+                location_zip = dealer["location_zip"],
+                city         = dealer["city"],
+                state        = dealer["state"],
+            )
+
+        # Sort the surviving one-per-dealer rows by price_per_lb DESC
+        vals = best.values()
+        if len(vals) <= 1:
+            return list(vals)
+        return sorted(vals, key=itemgetter("price_per_lb"), reverse=True)
 
 
 # ── Inline compare app ────────────────────────────────────────────────────────
 
+def _row_to_out(row: Dict, now_ts: float) -> Dict:
+    """
+    Build the DealerPriceOut-shaped response dict for an internal row (no
+    validation). Values are already JSON-native — Decimals as strings, like
+    DealerPriceOut's JSON dump — so the response skips jsonable_encoder.
+    """
+    return {
+        "dealer_id":       row["dealer_id"],
+        "dealer_name":     row["dealer_name"],
+        "location_zip":    row["location_zip"] or "",
+        "city":            row["city"],
+        "state":           row["state"],
+        "metal":           row["metal"],
+        "price_per_lb":    str(row["price_per_lb"]),
+        "price_per_ton":   str(row["price_per_ton"]),
+        "unit":            row["unit"],
+        "price_ts":        row["price_ts"].isoformat(),
+        "source":          row["source"],
+        "price_age_hours": round((now_ts - row["price_ts"].timestamp()) / 3600.0, 2),
+    }
+
+
 def build_compare_app(db: InMemoryDealerDB) -> FastAPI:
     app = FastAPI()
 
     @app.get("/prices/compare")
     async def compare_prices(metal: str, zip: str, radius_miles: int = 50):
-        zip_prefix = zip[:3] if len(zip) >= 3 else zip
-        rows = db.query_compare(metal=metal.upper(), zip_prefix=zip_prefix)
+        zip = zip.strip()
+        if not zip or len(zip) < 3 or not zip[:3].isdigit():
+            raise HTTPException(status_code=400, detail="zip_code must be a 5-digit ZIP")
+        zip_prefix = zip[:3]
+        # One clock read per request, shared by the query and age computation
+        now    = datetime.now(tz=timezone.utc)
+        now_ts = now.timestamp()
+        rows   = db.query_compare(
+            metal=metal.strip().upper(), zip_prefix=zip_prefix, now=now,
+        )
 
         if not rows:
             raise HTTPException(
@@ -124,35 +187,14 @@ def build_compare_app(db: InMemoryDealerDB) -> FastAPI:
                 detail=f"No dealer prices found for {metal.upper()} near ZIP {zip}",
             )
 
-        now = datetime.now(tz=timezone.utc)
-        results = []
-        for row in rows:
-            price_ts  = row["price_ts"]
-            age_hours = (now - price_ts).total_seconds() / 3600.0
-            results.append(
-                DealerPriceOut(
-                    dealer_id       = row["dealer_id"],
-                    dealer_name     = row["dealer_name"],
-                    location_zip    = row["location_zip"] or "",
-                    city            = row.get("city"),
-                    state           = row.get("state"),
-                    metal           = row["metal"],
-                    price_per_lb    = Decimal(str(row["price_per_lb"])),
-                    price_per_ton   = Decimal(str(row["price_per_ton"])),
-                    unit            = row.get("unit", "lb"),
-                    price_ts        = price_ts,
-                    source          = row["source"],
-                    price_age_hours = round(age_hours, 2),
-                )
-            )
-        return [r.model_dump() for r in results]
+        return JSONResponse([_row_to_out(row, now_ts) for row in rows])
 
     return app
 
 
 # ── Fixtures ──────────────────────────────────────────────────────────────────
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def populated_db() -> InMemoryDealerDB:
     """DB with 3 Houston-area dealers and prices for CU_BARE and HMS1."""
     db = InMemoryDealerDB()
@@ -178,12 +220,20 @@ def populated_db() -> InMemoryDealerDB:
     return db
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client(populated_db) -> TestClient:
     app = build_compare_app(populated_db)
     return TestClient(app)
 
 
+@pytest.fixture
+def restore_db(populated_db):
+    """For tests that add rows to the shared module-scoped DB."""
+    populated_db.snapshot()
+    yield populated_db
+    populated_db.restore()
+
+
 # ── Tests ─────────────────────────────────────────────────────────────────────
 
 class TestPriceComparison:
@@ -216,10 +266,10 @@ class TestPriceComparison:
         assert data[0]["dealer_name"]  == "Lone Star Recycling"
         assert float(data[0]["price_per_lb"]) == 3.92
 
-    def test_one_result_per_dealer(self, client, populated_db):
+    def test_one_result_per_dealer(self, client, restore_db):
         """Each dealer appears only once (deduplication)."""
         # Add a second (older) price for dealer_001 — should still appear once
-        populated_db.add_price("dealer_001", "CU_BARE", 3.70)
+        restore_db.add_price("dealer_001", "CU_BARE", 3.70)
         resp = client.get("/prices/compare?metal=CU_BARE&zip=77001")
         data = resp.json()
         dealer_ids = [r["dealer_id"] for r in data]
@@ -237,16 +287,29 @@ class TestPriceComparison:
             assert "price_ts"     in r
             assert "metal"        in r and r["metal"] == "HMS1"
 
+    def test_response_matches_dealer_price_out_schema(self, client):
+        """Hand-built response rows carry exactly the DealerPriceOut fields."""
+        resp = client.get("/prices/compare?metal=CU_BARE&zip=77001")
+        for r in resp.json():
+            assert set(r) == set(DealerPriceOut.model_fields)
+            DealerPriceOut.model_validate(r)
+
     def test_returns_404_for_unknown_metal(self, client):
         """Returns 404 when no dealers have prices for the requested metal."""
         resp = client.get("/prices/compare?metal=UNOBTAINIUM&zip=77001")
         assert resp.status_code == 404
 
-    def test_zip_filter_excludes_distant_dealers(self, client, populated_db):
+    def test_returns_400_for_short_or_invalid_zip(self, client):
+        """A ZIP without a 3-digit prefix is rejected instead of matching everything."""
+        for bad_zip in ("", "77", "ab123"):
+            resp = client.get(f"/prices/compare?metal=CU_BARE&zip={bad_zip}")
+            assert resp.status_code == 400, bad_zip
+
+    def test_zip_filter_excludes_distant_dealers(self, client, restore_db):
         """Dealers in a different 3-digit ZIP prefix are excluded."""
         # Add a dealer in Dallas (ZIP 75201 — prefix 752, not 770)
-        populated_db.add_dealer("dealer_dal", "Dallas Scrap Co", "75201", "Dallas", "TX")
-        populated_db.add_price("dealer_dal", "CU_BARE", 4.50)  # great price but far away
+        restore_db.add_dealer("dealer_dal", "Dallas Scrap Co", "75201", "Dallas", "TX")
+        restore_db.add_price("dealer_dal", "CU_BARE", 4.50)  # great price but far away
 
         resp = client.get("/prices/compare?metal=CU_BARE&zip=77001")
         data = resp.json()
@@ -282,13 +345,13 @@ class TestPriceComparison:
         assert data[0]["dealer_id"] == "dealer_003"
         assert float(data[0]["price_per_lb"]) == 0.68
 
-    def test_stale_prices_excluded(self, populated_db):
+    def test_stale_prices_excluded(self, restore_db):
         """Prices older than 30 days are not included in comparison."""
         old_ts = datetime.now(tz=timezone.utc) - timedelta(days=45)
-        populated_db.add_dealer("dealer_old", "Old Timer Scrap", "77004", "Houston", "TX")
-        populated_db.add_price("dealer_old", "CU_BARE", 4.99, price_ts=old_ts)
+        restore_db.add_dealer("dealer_old", "Old Timer Scrap", "77004", "Houston", "TX")
+        restore_db.add_price("dealer_old", "CU_BARE", 4.99, price_ts=old_ts)
 
-        app    = build_compare_app(populated_db)
+        app    = build_compare_app(restore_db)
         client = TestClient(app)
         resp   = client.get("/prices/compare?metal=CU_BARE&zip=77001")
         data   = resp.json()
@@ -325,3 +388,133 @@ class TestPriceComparison:
                 assert float(r["price_per_ton"]) == pytest.approx(
                     float(r["price_per_lb"]) * 2000, rel=0.01
                 )
+
+
+# ── models.get_price_comparison(): cache + single-flight ─────────────────────
+
+def _comparison_row(metal: str) -> tuple:
+    """One _SQL_PRICE_COMPARISON row, in its column order."""
+    return (
+        "dealer_001", "Houston Scrap Co", "77001", "Houston", "TX", metal,
+        Decimal("3.85"), Decimal("7700"), "lb", datetime.now(tz=timezone.utc), "dealer_manual",
+    )
+
+
+class _GatedPool:
+    """Fake asyncpg pool whose fetch() blocks until released; counts queries."""
+
+    def __init__(self, rows: bool = True) -> None:
+        self.queries = 0
+        self.rows    = rows
+        self.release = asyncio.Event()
+
+    async def fetch(self, query: str, metal: str, zip_prefix: str) -> list:
+        self.queries += 1
+        await self.release.wait()
+        return [_comparison_row(metal)] if self.rows else []
+
+
+@pytest.fixture
+def empty_price_cache():
+    models._PRICE_CACHE.clear()
+    yield
+    models._PRICE_CACHE.clear()
+
+
+@pytest.mark.usefixtures("empty_price_cache")
+class TestPriceComparisonSingleFlight:
+
+    def test_concurrent_callers_share_one_query(self):
+        async def scenario():
+            pool  = _GatedPool()
+            tasks = [
+                asyncio.create_task(models.get_price_comparison(pool, "CU_BARE", "77001"))
+                for _ in range(5)
+            ]
+            await asyncio.sleep(0)
+            pool.release.set()
+            results = await asyncio.gather(*tasks)
+            return pool.queries, results
+
+        queries, results = asyncio.run(scenario())
+        assert queries == 1
+        assert [len(r) for r in results] == [1] * 5
+
+    def test_cancelled_leader_does_not_fail_followers(self):
+        """The first caller disconnecting must not cancel the shared query."""
+        async def scenario():
+            pool   = _GatedPool()
+            leader = asyncio.create_task(models.get_price_comparison(pool, "CU_BARE", "77001"))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(models.get_price_comparison(pool, "CU_BARE", "77002"))
+            await asyncio.sleep(0)
+            leader.cancel()
+            await asyncio.sleep(0)
+            pool.release.set()
+            result = await follower
+            return pool.queries, leader.cancelled(), result
+
+        queries, leader_cancelled, result = asyncio.run(scenario())
+        assert leader_cancelled
+        assert queries == 1          # same ZIP prefix → same query
+        assert result[0].dealer_id == "dealer_001"
+
+    def test_result_cached_within_ttl(self):
+        async def scenario():
+            pool = _GatedPool()
+            pool.release.set()
+            await models.get_price_comparison(pool, "HMS1", "77001")
+            await models.get_price_comparison(pool, "HMS1", "77099")
+            return pool.queries
+
+        assert asyncio.run(scenario()) == 1
+
+    def test_failed_query_is_not_cached(self):
+        class FailingPool(_GatedPool):
+            async def fetch(self, query: str, metal: str, zip_prefix: str) -> list:
+                self.queries += 1
+                raise RuntimeError("db down")
+
+        async def scenario():
+            pool = FailingPool()
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    await models.get_price_comparison(pool, "LEAD", "77001")
+            return pool.queries
+
+        assert asyncio.run(scenario()) == 2
+
+    def test_empty_result_is_not_cached(self):
+        async def scenario():
+            pool = _GatedPool(rows=False)
+            pool.release.set()
+            for _ in range(2):
+                assert await models.get_price_comparison(pool, "ZORBA", "77001") == []
+            return pool.queries
+
+        assert asyncio.run(scenario()) == 2
+        assert models._PRICE_CACHE == {}
+
+    def test_unknown_metal_rejected_before_cache_or_db(self):
+        async def scenario():
+            pool = _GatedPool()
+            with pytest.raises(ValueError):
+                await models.get_price_comparison(pool, "UNOBTANIUM", "77001")
+            return pool.queries
+
+        assert asyncio.run(scenario()) == 0
+        assert models._PRICE_CACHE == {}
+
+    def test_cache_size_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(models, "_PRICE_CACHE_MAX_ENTRIES", 3)
+
+        async def scenario():
+            pool = _GatedPool()
+            pool.release.set()
+            for prefix in ("770", "771", "772", "773", "774"):
+                await models.get_price_comparison(pool, "CU_BARE", prefix + "01")
+
+        asyncio.run(scenario())
+        assert list(models._PRICE_CACHE) == [
+            ("CU_BARE", "772"), ("CU_BARE", "773"), ("CU_BARE", "774"),
+        ]
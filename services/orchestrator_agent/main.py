@@ -11,6 +11,7 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
 
 import asyncpg
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -50,15 +51,21 @@ async def startup():
     else:
         raise RuntimeError("Could not connect to database")
 
+    # Shared HTTP client for calls to sibling services (keep-alive reuse)
+    app.state.http = httpx.AsyncClient(timeout=60.0)
+
     # Start scheduler
-    scheduler = build_scheduler(app.state.pool)
+    scheduler = build_scheduler(app.state.pool, app.state.http)
     if scheduler:
         scheduler.start()
         app.state.scheduler = scheduler
         log.info("APScheduler started")
     else:
         # Fallback: run in background task
-        app.state.bg_task = asyncio.create_task(run_loop(app.state.pool))
+        app.state.shutdown_event = asyncio.Event()
+        app.state.bg_task = asyncio.create_task(
+            run_loop(app.state.pool, app.state.http, app.state.shutdown_event)
+        )
         log.info("Fallback loop task started")
 
 
@@ -67,7 +74,11 @@ async def shutdown():
     if hasattr(app.state, "scheduler"):
         app.state.scheduler.shutdown(wait=False)
     if hasattr(app.state, "bg_task"):
+        # Wakes the loop out of its 24h wait; cancel covers a tick in progress
+        app.state.shutdown_event.set()
         app.state.bg_task.cancel()
+    if hasattr(app.state, "http"):
+        await app.state.http.aclose()
     if hasattr(app.state, "pool"):
         await app.state.pool.close()
 
@@ -84,7 +95,7 @@ async def trigger():
     Still subject to all policy guardrails.
     """
     try:
-        await orchestrator_tick(app.state.pool)
+        await orchestrator_tick(app.state.pool, app.state.http)
         return {"status": "triggered"}
     except Exception as exc:
         return {"status": "error", "detail": str(exc)}
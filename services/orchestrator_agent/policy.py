@@ -11,18 +11,21 @@ This module exposes:
   check_action(action, actor, pool) → raises PolicyViolation or returns "ALLOWED"
   require_approval(config_key, pool) → raises PolicyViolation if not approved
   log_policy_event(action, actor, result, reason, pool) → writes to policy_events
+  invalidate_approval_cache(config_key=None) → drop cached approval checks
 """
 
 from __future__ import annotations
 
+import functools
 import os
 import sys
-from typing import Any, Optional
+import time
+from typing import Any, Dict, Optional, Tuple
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
 
-from common.audit import write_audit_entry_async, new_request_id
-from common.egress import EgressViolation, ALLOWLIST
+from common.audit import write_audit_and_policy_async, new_request_id
+from common.egress import EgressViolation, extract_host, is_allowed_host
 from common.logging_util import get_logger
 
 log = get_logger(__name__)
@@ -41,29 +44,68 @@ class PolicyViolation(Exception):
         )
 
 
+# ── Action names ──────────────────────────────────────────────────────────────
+# Interned so the guardrail set lookups below hit the identity fast path when
+# callers pass these constants (preferred over ad-hoc string literals).
+
+POST_JOURNAL_ENTRIES   = sys.intern("POST /journal_entries")
+PATCH_JOURNAL_ENTRIES  = sys.intern("PATCH /journal_entries")
+PUT_JOURNAL_ENTRIES    = sys.intern("PUT /journal_entries")
+DELETE_JOURNAL_ENTRIES = sys.intern("DELETE /journal_entries")
+CREATE_JOURNAL_ENTRY   = sys.intern("create_journal_entry")
+MODIFY_JOURNAL_ENTRY   = sys.intern("modify_journal_entry")
+
+UPDATE_SOURCE_CONFIGS  = sys.intern("UPDATE source_configs")
+INSERT_SOURCE_CONFIGS  = sys.intern("INSERT source_configs")
+DELETE_SOURCE_CONFIGS  = sys.intern("DELETE source_configs")
+MUTATE_SOURCE_CONFIG   = sys.intern("mutate_source_config")
+
+POST_FORECAST_RUN      = sys.intern("POST /forecast/run")
+
+
 # ── Blocked actions (Guardrail #1) ────────────────────────────────────────────
 
 # Actions that agents are NEVER allowed to perform
 _AGENT_BLOCKED_ACTIONS = {
-    "POST /journal_entries",
-    "PATCH /journal_entries",
-    "PUT /journal_entries",
-    "DELETE /journal_entries",
-    "create_journal_entry",
-    "modify_journal_entry",
+    POST_JOURNAL_ENTRIES,
+    PATCH_JOURNAL_ENTRIES,
+    PUT_JOURNAL_ENTRIES,
+    DELETE_JOURNAL_ENTRIES,
+    CREATE_JOURNAL_ENTRY,
+    MODIFY_JOURNAL_ENTRY,
 }
 
 # Actions that require HUMAN approval (Guardrail #2)
 _APPROVAL_REQUIRED_ACTIONS = {
-    "UPDATE source_configs",
-    "INSERT source_configs",
-    "DELETE source_configs",
-    "mutate_source_config",
+    UPDATE_SOURCE_CONFIGS,
+    INSERT_SOURCE_CONFIGS,
+    DELETE_SOURCE_CONFIGS,
+    MUTATE_SOURCE_CONFIG,
 }
 
 
 # ── Core policy check ─────────────────────────────────────────────────────────
 
+_DENY           = "DENY"
+_NEEDS_APPROVAL = "NEEDS_APPROVAL"
+_ALLOW          = "ALLOW"
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify_action(action: str, actor: str) -> str:
+    """
+    Static part of the policy decision for (action, actor).
+
+    Depends only on the guardrail sets above, so it is safe to memoize; call
+    _classify_action.cache_clear() if those sets are ever changed at runtime.
+    """
+    if actor == "agent" and action in _AGENT_BLOCKED_ACTIONS:
+        return _DENY
+    if action in _APPROVAL_REQUIRED_ACTIONS:
+        return _NEEDS_APPROVAL
+    return _ALLOW
+
+
 async def check_action(
     action: str,
     actor:  str,
@@ -87,44 +129,47 @@ async def check_action(
     """
     request_id = new_request_id()
     payload    = payload or {"action": action, "actor": actor}
+    decision   = _classify_action(action, actor)
 
     # Guardrail #1: Agent cannot create/modify journal entries
-    if actor == "agent" and action in _AGENT_BLOCKED_ACTIONS:
+    if decision is _DENY:
         reason = "Guardrail #1: agent is not permitted to create or modify journal entries"
-        await log_policy_event(action, actor, "DENIED", reason, pool)
-        await write_audit_entry_async(
+        await write_audit_and_policy_async(
             pool,
             request_id = request_id,
             actor      = actor,
             action     = action,
             payload    = {**payload, "result": "DENIED", "reason": reason},
+            result     = "DENIED",
+            reason     = reason,
         )
         raise PolicyViolation(action, actor, reason)
 
     # Guardrail #2: Source config mutations require approval
-    if action in _APPROVAL_REQUIRED_ACTIONS:
+    if decision is _NEEDS_APPROVAL:
         approved = await _has_active_approval(pool, action)
         if not approved:
             reason = "Guardrail #2: source config mutations require HUMAN-signed approval"
-            await log_policy_event(action, actor, "DENIED", reason, pool)
-            await write_audit_entry_async(
+            await write_audit_and_policy_async(
                 pool,
                 request_id = request_id,
                 actor      = actor,
                 action     = action,
                 payload    = {**payload, "result": "DENIED", "reason": reason},
+                result     = "DENIED",
+                reason     = reason,
             )
             raise PolicyViolation(action, actor, reason)
 
-    # Guardrail #4: Audit log (allowed path)
-    await write_audit_entry_async(
+    # Guardrail #4: Audit log + policy event (allowed path), one round-trip
+    await write_audit_and_policy_async(
         pool,
         request_id = request_id,
         actor      = actor,
         action     = action,
         payload    = {**payload, "result": "ALLOWED"},
+        result     = "ALLOWED",
     )
-    await log_policy_event(action, actor, "ALLOWED", None, pool)
     return "ALLOWED"
 
 
@@ -146,32 +191,62 @@ async def require_approval(config_key: str, pool: Any) -> None:
         )
 
 
+# Approvals are checked on every gated action. Only a *missing* approval is
+# cached, briefly: a revoked approval must stop working immediately, so a
+# positive result always comes from the DB, while a newly created approval
+# may take up to _APPROVAL_CACHE_TTL_SECONDS to be seen (fails closed).
+_APPROVAL_CACHE_TTL_SECONDS = 10.0
+
+# Kept as constants so every call sends identical text and hits asyncpg's
+# per-connection prepared-statement cache.
+_SQL_ANY_ACTIVE_APPROVAL = """
+    SELECT id, expires_at FROM approvals
+    WHERE NOT revoked
+      AND (expires_at IS NULL OR expires_at > NOW())
+    ORDER BY expires_at DESC NULLS FIRST
+    LIMIT 1
+"""
+
+_SQL_ACTIVE_APPROVAL_FOR_KEY = """
+    SELECT id, expires_at FROM approvals
+    WHERE config_key = $1
+      AND NOT revoked
+      AND (expires_at IS NULL OR expires_at > NOW())
+    ORDER BY expires_at DESC NULLS FIRST
+    LIMIT 1
+"""
+_APPROVAL_CACHE: Dict[Tuple[str, str], float] = {}   # cache key → no-approval-until
+
+
+def _approval_known_missing(cache_key: Tuple[str, str]) -> bool:
+    until = _APPROVAL_CACHE.get(cache_key)
+    return until is not None and time.monotonic() < until
+
+
+def _approval_store(cache_key: Tuple[str, str], row: Any) -> bool:
+    if row is None:
+        _APPROVAL_CACHE[cache_key] = time.monotonic() + _APPROVAL_CACHE_TTL_SECONDS
+        return False
+    _APPROVAL_CACHE.pop(cache_key, None)
+    return True
+
+
 async def _has_active_approval(pool: Any, action: str) -> bool:
     """Check if any non-expired, non-revoked approval exists (generic)."""
-    row = await pool.fetchrow(
-        """
-        SELECT id FROM approvals
-        WHERE NOT revoked
-          AND (expires_at IS NULL OR expires_at > NOW())
-        LIMIT 1
-        """
-    )
-    return row is not None
+    cache_key = ("action", action)
+    if _approval_known_missing(cache_key):
+        return False
+    row = await pool.fetchrow(_SQL_ANY_ACTIVE_APPROVAL)
+    return _approval_store(cache_key, row)
 
 
 async def _has_active_approval_for_key(pool: Any, config_key: str) -> bool:
     """Check for a HUMAN-signed, non-expired approval for a specific config key."""
-    row = await pool.fetchrow(
-        """
-        SELECT id FROM approvals
-        WHERE config_key = $1
-          AND NOT revoked
-          AND (expires_at IS NULL OR expires_at > NOW())
-        LIMIT 1
-        """,
-        config_key,
-    )
-    return row is not None
+    cache_key = ("key", config_key)
+    if _approval_known_missing(cache_key):
+        return False
+    row = await pool.fetchrow(_SQL_ACTIVE_APPROVAL_FOR_KEY, config_key)
+    return _approval_store(cache_key, row)
 
 
 # ── Egress guard helper (Guardrail #3) ────────────────────────────────────────
@@ -181,17 +256,18 @@ def check_egress(url: str) -> None:
     Raise EgressViolation if `url` domain is not in the allowlist.
     Delegates to common.egress for consistent enforcement.
     """
-    import urllib.parse
-    parsed = urllib.parse.urlparse(url)
-    host   = parsed.netloc.split(":")[0].lower()
-    if host.startswith("www."):
-        host = host[4:]
-
-    for allowed in ALLOWLIST:
-        if host == allowed or host.endswith("." + allowed):
-            return
-
-    raise EgressViolation(url, host)
+    denied_host = _denied_egress_host(url)
+    if denied_host is not None:
+        raise EgressViolation(url, denied_host)
+
+
+# The allowlist is fixed for the life of the process, so the decision per URL
+# is too; polled URLs are answered from the cache without re-parsing.
+@functools.lru_cache(maxsize=512)
+def _denied_egress_host(url: str) -> Optional[str]:
+    """Return the offending host if `url` is not allowed, else None."""
+    host = extract_host(url)
+    return None if is_allowed_host(host) else host
 
 
 # ── Event logger ──────────────────────────────────────────────────────────────
@@ -21,12 +21,23 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages
 from common.config import FORECAST_BASE_URL, ORCHESTRATOR_CRON
 from common.egress import egress_post
 from common.logging_util import get_logger
-from policy import check_action, PolicyViolation
+from policy import POST_FORECAST_RUN, check_action, PolicyViolation
 
 log = get_logger("orchestrator.scheduler")
 
 
-async def trigger_forecast_run(pool) -> dict:
+class _LazyNow:
+    """Log arg that reads the clock only if the record is actually emitted."""
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        return datetime.now(tz=timezone.utc).isoformat()
+
+
+_LAZY_NOW = _LazyNow()
+
+
+async def trigger_forecast_run(pool, client) -> dict:
     """
     Call the forecast service to run all models.
 
@@ -34,23 +45,23 @@ async def trigger_forecast_run(pool) -> dict:
     The forecast service is an internal service URL, not an external domain,
     so it uses httpx directly (not egress) — internal services are not
     subject to the egress allowlist which guards only external internet calls.
-    """
-    import httpx
 
+    `client` is the app-wide httpx.AsyncClient, so ticks reuse a kept-alive
+    connection to the forecast service.
+    """
     url = f"{FORECAST_BASE_URL}/forecast/run"
     log.info("Triggering forecast run at %s", url)
 
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(url)
-            resp.raise_for_status()
-            return resp.json()
+        resp = await client.post(url)
+        resp.raise_for_status()
+        return resp.json()
     except Exception as exc:
         log.error("Forecast run failed: %s", exc)
         return {"error": str(exc), "forecasts_created": 0}
 
 
-async def orchestrator_tick(pool) -> None:
+async def orchestrator_tick(pool, client) -> None:
     """
     Main orchestrator action — runs on schedule.
 
@@ -60,24 +71,24 @@ async def orchestrator_tick(pool) -> None:
     3. Generate markdown report
     4. Store report
     """
-    log.info("Orchestrator tick at %s", datetime.now(tz=timezone.utc).isoformat())
+    log.info("Orchestrator tick at %s", _LAZY_NOW)
 
     # Guardrail check before any action
     try:
-        await check_action("POST /forecast/run", "agent", pool)
+        await check_action(POST_FORECAST_RUN, "agent", pool)
     except PolicyViolation as exc:
         log.error("Orchestrator blocked by policy: %s", exc)
         return
 
     # Trigger forecast
     from reporter import generate_and_store_report
-    forecast_result = await trigger_forecast_run(pool)
+    forecast_result = await trigger_forecast_run(pool, client)
 
     # Generate and store report
     await generate_and_store_report(pool, forecast_result)
 
 
-def build_scheduler(pool):
+def build_scheduler(pool, client):
     """
     Build an APScheduler AsyncIOScheduler from the ORCHESTRATOR_CRON config.
 
@@ -104,7 +115,7 @@ def build_scheduler(pool):
                 day_of_week   = dow,
                 timezone      = "UTC",
             ),
-            args      = [pool],
+            args      = [pool, client],
             id        = "orchestrator_tick",
             name      = "MetalLedger orchestrator tick",
             replace_existing = True,
@@ -117,11 +128,15 @@ def build_scheduler(pool):
         return None
 
 
-async def run_loop(pool) -> None:
-    """Simple fallback: run tick every 24 hours."""
-    while True:
+async def run_loop(pool, client, shutdown_event: asyncio.Event) -> None:
+    """Simple fallback: run tick every 24 hours until shutdown_event is set."""
+    while not shutdown_event.is_set():
         try:
-            await orchestrator_tick(pool)
+            await orchestrator_tick(pool, client)
         except Exception as exc:
             log.exception("Orchestrator tick error: %s", exc)
-        await asyncio.sleep(86400)   # 24 hours
+        try:
+            await asyncio.wait_for(shutdown_event.wait(), timeout=86400)   # 24 hours
+            return
+        except asyncio.TimeoutError:
+            pass
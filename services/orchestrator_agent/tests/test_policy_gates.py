@@ -12,6 +12,7 @@ Verifies:
 from __future__ import annotations
 
 import os
+import re
 import sys
 import asyncio
 
@@ -21,11 +22,21 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "pa
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from common.egress import EgressViolation, ALLOWLIST
-from policy import PolicyViolation, check_action, check_egress, require_approval
+import policy
+from policy import (
+    PolicyViolation,
+    check_action,
+    check_egress,
+    require_approval,
+)
 
 
 # ── In-memory pool mock ───────────────────────────────────────────────────────
 
+# Tables a statement inserts into (a CTE can insert into more than one)
+_INSERT_TARGETS = re.compile(r"INSERT INTO (\w+)")
+
+
 class _FakeConn:
     """Fake asyncpg connection."""
 
@@ -33,10 +44,7 @@ class _FakeConn:
         self._pool = pool
 
     async def execute(self, query: str, *args):
-        if "INSERT INTO policy_events" in query:
-            self._pool.policy_events.append(args)
-        if "INSERT INTO audit_log" in query:
-            self._pool.audit_log.append(args)
+        self._pool._record(query, args)
 
     async def fetchrow(self, query: str, *args):
         if "approvals" in query and self._pool._has_approval:
@@ -65,27 +73,58 @@ class FakePool:
         self._has_approval = has_approval
         self.policy_events: list = []
         self.audit_log:     list = []
+        self.approval_queries = 0
+        self._tables = {
+            "policy_events": self.policy_events,
+            "audit_log":     self.audit_log,
+        }
+
+    def _record(self, query: str, args: tuple) -> None:
+        for table in _INSERT_TARGETS.findall(query):
+            rows = self._tables.get(table)
+            if rows is not None:
+                rows.append(args)
 
     def acquire(self):
         return _FakeAcquire(self)
 
     async def execute(self, query: str, *args):
-        if "INSERT INTO policy_events" in query:
-            self.policy_events.append(args)
+        self._record(query, args)
 
     async def fetchrow(self, query: str, *args):
-        if "approvals" in query and self._has_approval:
-            return {"id": 1}
+        if "approvals" in query:
+            self.approval_queries += 1
+            if self._has_approval:
+                return {"id": 1, "expires_at": None}
         return None
 
     async def fetchval(self, query: str, *args):
         return None
 
 
+@pytest.fixture(autouse=True)
+def _fresh_approval_cache():
+    """Missing approvals are cached per process; isolate each test's FakePool."""
+    policy._APPROVAL_CACHE.clear()
+    yield
+    policy._APPROVAL_CACHE.clear()
+
+
 # ── Helper to run async tests ─────────────────────────────────────────────────
+# One loop shared by every test in the module (closed at teardown) instead of
+# asyncio.get_event_loop(), which is deprecated without a running loop.
+
+_LOOP = asyncio.new_event_loop()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _close_loop():
+    yield
+    _LOOP.close()
+
 
 def run(coro):
-    return asyncio.get_event_loop().run_until_complete(coro)
+    return _LOOP.run_until_complete(coro)
 
 
 # ── Test: Guardrail #1 — agent cannot journal ─────────────────────────────────
@@ -159,6 +198,30 @@ class TestGuardrail2_SourceConfigApproval:
         # Should not raise
         run(require_approval("metals_api", pool))
 
+    def test_revoked_approval_takes_effect_immediately(self):
+        """Positive approval results are never cached: revocation is seen at once."""
+        pool = FakePool(has_approval=True)
+        run(require_approval("metals_api", pool))
+
+        pool._has_approval = False
+        with pytest.raises(PolicyViolation):
+            run(require_approval("metals_api", pool))
+        assert pool.approval_queries == 2
+
+    def test_missing_approval_is_cached_briefly(self):
+        """Repeat denials skip the DB until the short negative TTL lapses."""
+        pool = FakePool(has_approval=False)
+        for _ in range(2):
+            with pytest.raises(PolicyViolation):
+                run(require_approval("metals_api", pool))
+        assert pool.approval_queries == 1
+
+        # New approval granted: picked up once the negative entry expires
+        pool._has_approval = True
+        policy._APPROVAL_CACHE[("key", "metals_api")] = 0.0
+        run(require_approval("metals_api", pool))
+        assert pool.approval_queries == 2
+
 
 # ── Test: Guardrail #3 — Egress allowlist ────────────────────────────────────
 
@@ -181,6 +244,11 @@ class TestGuardrail3_EgressAllowlist:
         """Subdomains of allowed domains pass (e.g. data.metals-api.com)."""
         check_egress("https://data.metals-api.com/endpoint")
 
+    def test_suffix_without_label_boundary_blocked(self):
+        """evilmetals-api.com ends with an allowed name but is not a subdomain."""
+        with pytest.raises(EgressViolation):
+            check_egress("https://evilmetals-api.com/api/latest")
+
     def test_unlisted_domain_raises_egress_violation(self):
         """A domain not on the allowlist raises EgressViolation."""
         with pytest.raises(EgressViolation) as exc_info:
@@ -216,7 +284,7 @@ class TestGuardrail4_AuditLog:
 
         audit_entries: list = []
 
-        async def capturing_write(pool, *, request_id, actor, action, payload):
+        async def capturing_write(pool, *, request_id, actor, action, payload, result, reason=None):
             """Capture calls in our local list AND the in-memory log."""
             write_audit_entry_memory(
                 request_id=request_id,
@@ -226,15 +294,15 @@ class TestGuardrail4_AuditLog:
             )
             audit_entries.append({"actor": actor, "action": action})
 
-        original = policy_mod.write_audit_entry_async
-        policy_mod.write_audit_entry_async = capturing_write
+        original = policy_mod.write_audit_and_policy_async
+        policy_mod.write_audit_and_policy_async = capturing_write
 
         clear_memory_log()
         pool = FakePool()
         try:
             run(check_action("POST /forecast/run", "agent", pool))
         finally:
-            policy_mod.write_audit_entry_async = original
+            policy_mod.write_audit_and_policy_async = original
 
         assert len(audit_entries) > 0, "No audit entries written"
         assert any(e["actor"] == "agent" for e in audit_entries)
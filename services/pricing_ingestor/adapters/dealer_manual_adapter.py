@@ -46,30 +46,34 @@ Endpoint:
 
 from __future__ import annotations
 
+import functools
 import os
 import sys
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from common.logging_util import get_logger
-from common.types import PricePoint
+from common.types import Metal, PricePoint
 
 log = get_logger(__name__)
 
-# Supported metal slugs for dealer submissions
-VALID_METAL_SLUGS = {
-    # Ferrous
-    "HMS1", "HMS2", "SHRED", "CAST",
-    # Non-ferrous
-    "CU_BARE", "CU_1", "CU_2",
-    "AL_CAST", "AL_EXTRUSION",
-    "BRASS", "SS_304", "LEAD", "ZORBA",
-}
+# Supported metal slugs for dealer submissions (common.types.Metal, which the
+# ledger's price comparison lookup validates against too)
+VALID_METAL_SLUGS = frozenset(sys.intern(m.value) for m in Metal)
 
-VALID_UNITS = {"lb", "ton"}
+# For error messages, so a rejected submission doesn't re-sort the set
+_SORTED_SLUGS = tuple(sorted(VALID_METAL_SLUGS))
+
+VALID_UNITS = frozenset({"lb", "ton"})
+
+# PricePoint values are stored to 6 dp (matches NUMERIC(18,6) in prices_raw)
+_Q6         = Decimal("0.000001")
+_LB_PER_TON = Decimal("2000")   # 1 short ton = 2000 lb
 
 
 class DealerPriceSubmission:
@@ -93,7 +97,7 @@ class DealerPriceSubmission:
         if metal_slug not in VALID_METAL_SLUGS:
             raise ValueError(
                 f"Unknown metal_slug '{metal_slug}'. "
-                f"Valid slugs: {sorted(VALID_METAL_SLUGS)}"
+                f"Valid slugs: {list(_SORTED_SLUGS)}"
             )
         if unit not in VALID_UNITS:
             raise ValueError(f"unit must be 'lb' or 'ton', got '{unit}'")
@@ -116,6 +120,12 @@ class DealerPriceSubmission:
             self.price_per_ton = price_per_lb * 2000.0
 
 
+@functools.lru_cache(maxsize=4096)
+def _source_id_prefix(dealer_id: str, metal_slug: str) -> str:
+    """Static part of a dealer price source_id; only the timestamp varies."""
+    return f"dealer_{dealer_id}_{metal_slug}_"
+
+
 def submission_to_price_point(
     submission: DealerPriceSubmission,
     fetched_at: Optional[datetime] = None,
@@ -126,14 +136,20 @@ def submission_to_price_point(
     The PricePoint venue encodes the dealer_id for downstream traceability.
     """
     ts = fetched_at or datetime.now(tz=timezone.utc)
+    # Quantize straight from the submitted float; for per-ton submissions
+    # divide in Decimal so the float division's rounding error isn't kept.
+    if submission.unit == "ton":
+        value = (Decimal(submission.price_per_ton) / _LB_PER_TON).quantize(_Q6)
+    else:
+        value = Decimal(submission.price_per_lb).quantize(_Q6)
     return PricePoint(
         source    = "dealer_manual",
         metal     = submission.metal_slug,
         venue     = f"DEALER:{submission.dealer_id}:{submission.location_zip}",
         price_ts  = ts,
-        value     = Decimal(str(round(submission.price_per_lb, 6))),
+        value     = value,
         currency  = "USD",
-        source_id = f"dealer_{submission.dealer_id}_{submission.metal_slug}_{int(ts.timestamp())}",
+        source_id = _source_id_prefix(submission.dealer_id, submission.metal_slug) + str(int(ts.timestamp())),
     )
 
 
@@ -148,8 +164,8 @@ def build_dealer_router():
         from adapters.dealer_manual_adapter import build_dealer_router
         app.include_router(build_dealer_router())
 
-    The router expects app.state.pool (asyncpg pool) and app.state.normalizer
-    to be set at startup.
+    Writes go through the process-wide pool from common.db.get_pool(), the
+    same one the ingest loop uses.
     """
     try:
         from fastapi import APIRouter, HTTPException, Request, status
@@ -171,10 +187,10 @@ def build_dealer_router():
         @field_validator("metal_slug")
         @classmethod
         def validate_metal(cls, v: str) -> str:
-            v = v.upper().strip()
+            v = sys.intern(v.upper().strip())
             if v not in VALID_METAL_SLUGS:
                 raise ValueError(
-                    f"Unknown metal_slug '{v}'. Valid: {sorted(VALID_METAL_SLUGS)}"
+                    f"Unknown metal_slug '{v}'. Valid: {list(_SORTED_SLUGS)}"
                 )
             return v
 
@@ -236,7 +252,7 @@ def build_dealer_router():
         price_id    = price_point.source_id
 
         # In production: run through normalizer, write to prices_raw, link to dealer
-        # pool = request.app.state.pool
+        # pool = await get_pool()          # from common.db
         # await pool.execute(
         #     """
         #     INSERT INTO prices_raw
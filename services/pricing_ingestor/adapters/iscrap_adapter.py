@@ -32,9 +32,11 @@ import os
 import sys
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from common.logging_util import get_logger
 from common.types import PricePoint
@@ -91,24 +93,36 @@ _SYNTHETIC_YARDS: List[Dict[str, Any]] = [
 ]
 
 
+# Flattened once at import: (metal, venue, value, source_id prefix). Only the
+# timestamp varies per call, so Decimal parsing and id formatting aren't redone.
+_SYNTHETIC_TEMPLATES: List[Tuple[str, str, Decimal, str]] = [
+    (
+        metal,
+        yard["yard_name"],
+        Decimal(str(price_per_lb)),
+        f"iscrap_synthetic_{yard['yard_id']}_{metal}_",
+    )
+    for yard in _SYNTHETIC_YARDS
+    for metal, price_per_lb in yard["prices"].items()
+]
+
+
 def _synthetic_prices(fetched_at: datetime) -> List[PricePoint]:
     """Return synthetic scrap prices mimicking iScrap yard listings."""
     log.info("iScrap: no live scraper configured — returning synthetic yard price data")
-    points: List[PricePoint] = []
-    for yard in _SYNTHETIC_YARDS:
-        for metal, price_per_lb in yard["prices"].items():
-            points.append(
-                PricePoint(
-                    source    = "iscrap",
-                    metal     = metal,
-                    venue     = yard["yard_name"],
-                    price_ts  = fetched_at,
-                    value     = Decimal(str(price_per_lb)),
-                    currency  = "USD",
-                    source_id = f"iscrap_synthetic_{yard['yard_id']}_{metal}_{int(fetched_at.timestamp())}",
-                )
-            )
-    return points
+    ts_int = int(fetched_at.timestamp())
+    return [
+        PricePoint(
+            source    = "iscrap",
+            metal     = metal,
+            venue     = venue,
+            price_ts  = fetched_at,
+            value     = value,
+            currency  = "USD",
+            source_id = f"{prefix}{ts_int}",
+        )
+        for metal, venue, value, prefix in _SYNTHETIC_TEMPLATES
+    ]
 
 
 async def _scrape_yard_prices(zip_code: str, fetched_at: datetime) -> List[PricePoint]:
@@ -34,7 +34,7 @@ Licensing notes:
 
 from __future__ import annotations
 
-import csv
+import functools
 import io
 import os
 import sys
@@ -42,7 +42,9 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from common.egress import egress_get
 from common.logging_util import get_logger
@@ -59,23 +61,40 @@ _SYNTHETIC_RATES: Dict[str, float] = {
     "XAU": 2038.75,   # LBMA Gold AM Fix
     "XAG": 23.72,     # LBMA Silver Fix
 }
+# (metal, response key, lowercased metal for source_id) in the live response
+_LIVE_KEYS = (("XAU", "xauUSD", "xau"), ("XAG", "xagUSD", "xag"))
+
+_SYNTHETIC_DECIMALS: Dict[str, Decimal] = {
+    symbol: Decimal(str(price)) for symbol, price in _SYNTHETIC_RATES.items()
+}
+
+
+# Backfill CSVs can span decades of daily fixes: use pandas' multithreaded
+# pyarrow reader when pyarrow is installed, else its C tokenizer.
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = "pyarrow"
+except ImportError:
+    _CSV_ENGINE = "c"
 
 
 # ── Private helpers ───────────────────────────────────────────────────────────
 
 def _synthetic_prices(fetched_at: datetime) -> List[PricePoint]:
     log.info("LBMA: no live feed configured — returning synthetic AM-fix data")
+    am_ts    = fetched_at.replace(hour=10, minute=30, second=0, microsecond=0)
+    date_str = fetched_at.date().isoformat()
     return [
         PricePoint(
             source    = "lbma",
             metal     = symbol,
             venue     = "LBMA_AM",
-            price_ts  = fetched_at.replace(hour=10, minute=30, second=0, microsecond=0),
-            value     = Decimal(str(price)),
+            price_ts  = am_ts,
+            value     = value,
             currency  = "USD",
-            source_id = f"lbma_synthetic_{symbol}_{fetched_at.date()}",
+            source_id = f"lbma_synthetic_{symbol}_{date_str}",
         )
-        for symbol, price in _SYNTHETIC_RATES.items()
+        for symbol, value in _SYNTHETIC_DECIMALS.items()
     ]
 
 
@@ -90,28 +109,75 @@ def _parse_csv(csv_text: str, fetched_at: datetime) -> List[PricePoint]:
 
     Returns only AM fix prices.  Extend to PM as needed.
     """
-    reader = csv.DictReader(io.StringIO(csv_text.strip()))
+    return _parse_csv_source(io.StringIO(csv_text.strip()), fetched_at)
+
+
+def _parse_csv_file(path: str, fetched_at: datetime) -> List[PricePoint]:
+    """
+    Parse a LBMA CSV straight from disk (see _parse_csv for the format).
+
+    The reader is handed the path rather than the file's text, so a large
+    backfill is never held in memory as one str. The C engine memory-maps
+    the file; pyarrow does its own buffered IO.
+    """
+    extra = {"memory_map": True} if _CSV_ENGINE == "c" else {}
+    return _parse_csv_source(path, fetched_at, **extra)
+
+
+def _parse_csv_source(source: Any, fetched_at: datetime, **read_kwargs: Any) -> List[PricePoint]:
+    # pandas' native readers and vectorised date parsing instead of a per-row
+    # DictReader + strptime; only needed for CSV backfills, so imported here.
+    import pandas as pd
+
+    df = pd.read_csv(
+        source,
+        dtype           = str,
+        keep_default_na = False,
+        engine          = _CSV_ENGINE,
+        **read_kwargs,
+    )
+    if "Date" not in df.columns:
+        log.warning("LBMA CSV has no 'Date' column (columns: %s)", list(df.columns))
+        return []
+
+    # First non-empty AM column per row, as "USD AM" / "XAU AM" / "AM"
+    am_cols = [c for c in ("USD AM", "XAU AM", "AM") if c in df.columns]
+    if not am_cols:
+        return []
+    am_df = df[am_cols]
+    am = am_df.mask(am_df == "").bfill(axis=1).iloc[:, 0]
+    am = am.str.replace(",", "", regex=False)
+
+    fix_ts = pd.to_datetime(df["Date"], format="%Y-%m-%d", errors="coerce", utc=True)
+    fix_ts = fix_ts + pd.Timedelta(hours=10, minutes=30)
+
+    # Validate whole columns up front rather than try/except per row; rows
+    # with no AM value at all are skipped silently, as before.
+    num       = pd.to_numeric(am, errors="coerce")
+    bad_date  = fix_ts.isna()
+    bad_value = am.notna() & ~(num.abs() < float("inf"))
+    bad       = bad_date | bad_value
+    if bad.any():
+        log.warning(
+            "LBMA CSV: skipped %d unparseable row(s) (bad date or AM value); first: %s",
+            int(bad.sum()), df.loc[bad, "Date"].head(5).tolist(),
+        )
+    keep = ~bad & am.notna()
+
     points: List[PricePoint] = []
-    for row in reader:
-        try:
-            fix_date = datetime.strptime(row["Date"], "%Y-%m-%d").replace(
-                tzinfo=timezone.utc, hour=10, minute=30
+    for ts, am_val in zip(fix_ts[keep], am[keep]):
+        fix_date = ts.to_pydatetime()
+        points.append(
+            PricePoint(
+                source    = "lbma",
+                metal     = "XAU",
+                venue     = "LBMA_AM",
+                price_ts  = fix_date,
+                value     = Decimal(am_val),
+                currency  = "USD",
+                source_id = f"lbma_xau_am_{fix_date.date()}",
             )
-            am_val = row.get("USD AM") or row.get("XAU AM") or row.get("AM")
-            if am_val:
-                points.append(
-                    PricePoint(
-                        source    = "lbma",
-                        metal     = "XAU",
-                        venue     = "LBMA_AM",
-                        price_ts  = fix_date,
-                        value     = Decimal(am_val.replace(",", "")),
-                        currency  = "USD",
-                        source_id = f"lbma_xau_am_{fix_date.date()}",
-                    )
-                )
-        except (ValueError, KeyError) as exc:
-            log.warning("LBMA CSV parse error on row %s: %s", row, exc)
+        )
     return points
 
 
@@ -136,9 +202,11 @@ async def _fetch_live(fetched_at: datetime) -> List[PricePoint]:
     # Adapt parsing to actual LBMA response schema
     data = response.json()
     points: List[PricePoint] = []
+    am_ts    = fetched_at.replace(hour=10, minute=30, second=0)
+    date_str = fetched_at.date().isoformat()
     # Example shape (hypothetical):
     # {"date": "2024-01-02", "xauUSD": {"am": 2063.10, "pm": 2066.50}}
-    for metal, key in [("XAU", "xauUSD"), ("XAG", "xagUSD")]:
+    for metal, key, metal_lower in _LIVE_KEYS:
         metal_data = data.get(key, {})
         am_val = metal_data.get("am")
         if am_val:
@@ -147,15 +215,21 @@ async def _fetch_live(fetched_at: datetime) -> List[PricePoint]:
                     source    = "lbma",
                     metal     = metal,
                     venue     = "LBMA_AM",
-                    price_ts  = fetched_at.replace(hour=10, minute=30, second=0),
+                    price_ts  = am_ts,
                     value     = Decimal(str(am_val)),
                     currency  = "USD",
-                    source_id = f"lbma_{metal.lower()}_am_{fetched_at.date()}",
+                    source_id = f"lbma_{metal_lower}_am_{date_str}",
                 )
             )
     return points
 
 
+@functools.lru_cache(maxsize=1)
+def _csv_backfill_available() -> bool:
+    """LBMA_CSV_PATH is set and is a file. Checked once per process."""
+    return bool(_LBMA_CSV_PATH) and os.path.isfile(_LBMA_CSV_PATH)
+
+
 # ── Public API ────────────────────────────────────────────────────────────────
 
 async def fetch_prices() -> List[PricePoint]:
@@ -169,11 +243,9 @@ async def fetch_prices() -> List[PricePoint]:
     """
     fetched_at = datetime.now(tz=timezone.utc)
 
-    if _LBMA_CSV_PATH and os.path.isfile(_LBMA_CSV_PATH):
+    if _csv_backfill_available():
         log.info("LBMA: reading from local CSV: %s", _LBMA_CSV_PATH)
-        with open(_LBMA_CSV_PATH, "r") as f:
-            csv_text = f.read()
-        return _parse_csv(csv_text, fetched_at)
+        return _parse_csv_file(_LBMA_CSV_PATH, fetched_at)
 
     if _LBMA_API_KEY:
         try:
@@ -22,7 +22,9 @@ import sys
 import os
 
 # Allow running from service root without installing packages
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from datetime import datetime, timezone
 from decimal import Decimal
@@ -38,6 +40,10 @@ log = get_logger(__name__)
 # Metals-API.com endpoint — see https://metals-api.com/documentation
 _BASE_URL = "https://metals-api.com/api/latest"
 _SYMBOLS  = "XAU,XAG,CU"
+_SYMBOL_LIST = ("XAU", "XAG", "CU")
+
+_ONE = Decimal(1)
+_Q6  = Decimal("0.000001")
 
 # Synthetic fallback data — updated weekly during dev; mirrors API shape
 _SYNTHETIC_RATES: Dict[str, float] = {
@@ -45,6 +51,9 @@ _SYNTHETIC_RATES: Dict[str, float] = {
     "XAG": 23.85,
     "CU":  3.912,
 }
+_SYNTHETIC_DECIMALS: Dict[str, Decimal] = {
+    symbol: Decimal(str(price)) for symbol, price in _SYNTHETIC_RATES.items()
+}
 
 
 def _parse_response(data: Dict[str, Any], fetched_at: datetime) -> List[PricePoint]:
@@ -70,15 +79,18 @@ def _parse_response(data: Dict[str, Any], fetched_at: datetime) -> List[PricePoi
     rates: Dict[str, float] = data.get("rates", {})
     base:  str              = data.get("base", "USD")
     points: List[PricePoint] = []
+    ts_int = int(fetched_at.timestamp())
 
-    for symbol in ["XAU", "XAG", "CU"]:
+    for symbol in _SYMBOL_LIST:
         rate = rates.get(symbol)
         if rate is None or rate <= 0:
             log.warning("Missing or zero rate for %s in metals-api response", symbol)
             continue
 
-        # Invert: API gives oz-per-USD, we store USD-per-oz
-        usd_price = Decimal(str(round(1.0 / rate, 6)))
+        # Invert: API gives oz-per-USD, we store USD-per-oz. Divide in Decimal
+        # from the rate as quoted, rather than float-divide then round-trip
+        # through round() and str().
+        usd_price = (_ONE / Decimal(str(rate))).quantize(_Q6)
 
         points.append(
             PricePoint(
@@ -88,7 +100,7 @@ def _parse_response(data: Dict[str, Any], fetched_at: datetime) -> List[PricePoi
                 price_ts  = fetched_at,
                 value     = usd_price,
                 currency  = base,
-                source_id = f"metals_api_{symbol}_{int(fetched_at.timestamp())}",
+                source_id = f"metals_api_{symbol}_{ts_int}",
             )
         )
 
@@ -98,17 +110,18 @@ def _parse_response(data: Dict[str, Any], fetched_at: datetime) -> List[PricePoi
 def _synthetic_prices(fetched_at: datetime) -> List[PricePoint]:
     """Return deterministic synthetic prices when no API key is configured."""
     log.info("METALS_API_KEY not set — using synthetic price data")
+    ts_int = int(fetched_at.timestamp())
     return [
         PricePoint(
             source    = "metals_api",
             metal     = symbol,
             venue     = "SPOT",
             price_ts  = fetched_at,
-            value     = Decimal(str(price)),
+            value     = value,
             currency  = "USD",
-            source_id = f"synthetic_{symbol}_{int(fetched_at.timestamp())}",
+            source_id = f"synthetic_{symbol}_{ts_int}",
         )
-        for symbol, price in _SYNTHETIC_RATES.items()
+        for symbol, value in _SYNTHETIC_DECIMALS.items()
     ]
 
 
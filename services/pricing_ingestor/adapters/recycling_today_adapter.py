@@ -47,7 +47,9 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from common.logging_util import get_logger
 from common.types import PricePoint
@@ -68,6 +70,24 @@ _SYNTHETIC_BENCHMARKS: Dict[str, Dict[str, Any]] = {
     "ZORBA": {"price": 0.67,   "unit": "lb",   "venue": "US_DOMESTIC", "description": "Zorba 95/2 (mixed non-ferrous shredded) — US benchmark"},
 }
 
+# Fastmarkets unit → pounds per unit (prices are stored per lb)
+_UNIT_LBS: Dict[str, Decimal] = {
+    "gross ton": Decimal("2240"),   # long ton (HMS export)
+    "long ton":  Decimal("2240"),
+    "short ton": Decimal("2000"),
+    "ton":       Decimal("2000"),
+    "lb":        Decimal("1"),
+}
+
+_Q6 = Decimal("0.000001")
+
+# Benchmarks normalized to $/lb for internal storage, computed once; these
+# never change between calls.
+_SYNTHETIC_PER_LB: Dict[str, Decimal] = {
+    metal: (Decimal(str(info["price"])) / _UNIT_LBS[info["unit"]]).quantize(_Q6)
+    for metal, info in _SYNTHETIC_BENCHMARKS.items()
+}
+
 # Fastmarkets price codes (for reference when wiring real API)
 _FASTMARKETS_CODES: Dict[str, str] = {
     "HMS1":  "MB-FE-0003",   # HMS 1&2 (80:20) US export - $/gross ton
@@ -81,26 +101,18 @@ _FASTMARKETS_CODES: Dict[str, str] = {
 def _synthetic_prices(fetched_at: datetime) -> List[PricePoint]:
     """Return synthetic commodity benchmark prices mimicking Fastmarkets data."""
     log.info("Fastmarkets/RecyclingToday: no live feed — returning synthetic benchmark data")
+    ts_int = int(fetched_at.timestamp())
     points: List[PricePoint] = []
     for metal, info in _SYNTHETIC_BENCHMARKS.items():
-        # Store price as price_per_lb for consistency; include unit in source_id
-        price = info["price"]
-        unit  = info["unit"]
-        # Normalize to $/lb for internal storage (ferrous: $/ton ÷ 2000)
-        if unit == "ton":
-            price_per_lb = price / 2000.0
-        else:
-            price_per_lb = price
-
         points.append(
             PricePoint(
                 source    = "recycling_today",
                 metal     = metal,
                 venue     = info["venue"],
                 price_ts  = fetched_at,
-                value     = Decimal(str(round(price_per_lb, 6))),
+                value     = _SYNTHETIC_PER_LB[metal],
                 currency  = "USD",
-                source_id = f"fastmarkets_synthetic_{_FASTMARKETS_CODES.get(metal, metal)}_{int(fetched_at.timestamp())}",
+                source_id = f"fastmarkets_synthetic_{_FASTMARKETS_CODES.get(metal, metal)}_{ts_int}",
             )
         )
     return points
@@ -145,10 +157,10 @@ async def _fetch_live(fetched_at: datetime) -> List[PricePoint]:
     # resp = await egress_get(url, params={"codes": codes}, headers=headers)
     # resp.raise_for_status()
     # data = resp.json()
-    # return _parse_response(data["data"], fetched_at)
+    # (map data["data"] records to PricePoints per the steps above)
     raise NotImplementedError(
         "Fastmarkets live feed not implemented. "
-        "Add api.fastmarkets.com to EGRESS_ALLOWLIST and implement _parse_response()."
+        "Add api.fastmarkets.com to EGRESS_ALLOWLIST and implement _fetch_live()."
     )
 
 
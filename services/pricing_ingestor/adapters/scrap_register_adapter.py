@@ -19,6 +19,7 @@ HOW TO WIRE THE REAL FEED:
    HTML-rendered and require scraping (BeautifulSoup or Playwright).
 3. Alternatively, contact them for a data licensing arrangement.
 4. Set SCRAP_REGISTER_USER_AGENT and SCRAP_REGISTER_REGION env vars.
+   SCRAP_REGISTER_ENABLED=false turns fetch_prices() into a no-op.
 
 Stub behavior:
    Returns synthetic regional average prices per pound for all supported metals,
@@ -34,7 +35,9 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from common.logging_util import get_logger
 from common.types import PricePoint
@@ -44,6 +47,7 @@ log = get_logger(__name__)
 _BASE_URL    = "https://www.scrapregister.com"
 _USER_AGENT  = os.getenv("SCRAP_REGISTER_USER_AGENT", "MetalLedger/0.1 (price research)")
 _REGION      = os.getenv("SCRAP_REGISTER_REGION", "South")
+_ENABLED     = os.getenv("SCRAP_REGISTER_ENABLED", "true").lower() not in ("0", "false", "no", "off")
 
 # Synthetic regional average prices (price_per_lb, USD)
 # ScrapRegister typically organizes by region: South, Midwest, Northeast, West
@@ -109,23 +113,43 @@ _SYNTHETIC_REGIONAL: Dict[str, Dict[str, float]] = {
         "CAST":         0.072,
     },
 }
+# Many regional prices repeat (e.g. LEAD 0.44 in West and Northeast); Decimals
+# are immutable, so equal values share one instance.
+_DECIMAL_POOL: Dict[str, Decimal] = {}
+
+
+def _pooled_decimal(price: float) -> Decimal:
+    key = str(price)
+    value = _DECIMAL_POOL.get(key)
+    if value is None:
+        value = _DECIMAL_POOL[key] = Decimal(key)
+    return value
+
+
+_SYNTHETIC_REGIONAL_DECIMALS: Dict[str, Dict[str, Decimal]] = {
+    region: {metal: _pooled_decimal(price) for metal, price in prices.items()}
+    for region, prices in _SYNTHETIC_REGIONAL.items()
+}
 
 
 def _synthetic_prices(region: str, fetched_at: datetime) -> List[PricePoint]:
     """Return synthetic regional average prices mimicking ScrapRegister listings."""
     log.info("ScrapRegister: no live scraper configured — returning synthetic regional data for %s", region)
-    regional_data = _SYNTHETIC_REGIONAL.get(region, _SYNTHETIC_REGIONAL["South"])
+    regional_data = _SYNTHETIC_REGIONAL_DECIMALS.get(region, _SYNTHETIC_REGIONAL_DECIMALS["South"])
+    venue         = f"REGIONAL_{region.upper()}"
+    id_prefix     = f"scrapreg_synthetic_{region.lower()}_"
+    ts_int        = int(fetched_at.timestamp())
     points: List[PricePoint] = []
     for metal, price_per_lb in regional_data.items():
         points.append(
             PricePoint(
                 source    = "scrap_register",
                 metal     = metal,
-                venue     = f"REGIONAL_{region.upper()}",
+                venue     = venue,
                 price_ts  = fetched_at,
-                value     = Decimal(str(price_per_lb)),
+                value     = price_per_lb,
                 currency  = "USD",
-                source_id = f"scrapreg_synthetic_{region.lower()}_{metal}_{int(fetched_at.timestamp())}",
+                source_id = f"{id_prefix}{metal}_{ts_int}",
             )
         )
     return points
@@ -185,7 +209,11 @@ async def fetch_prices(region: Optional[str] = None) -> List[PricePoint]:
 
     Note:
         Falls back to synthetic data until live scraper is wired.
+        Returns [] without doing any work when SCRAP_REGISTER_ENABLED is off.
     """
+    if not _ENABLED:
+        return []
+
     fetched_at = datetime.now(tz=timezone.utc)
     region     = region or _REGION
 
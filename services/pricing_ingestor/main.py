@@ -17,17 +17,26 @@ from __future__ import annotations
 
 import asyncio
 import os
+import random
 import sys
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 import asyncpg
 
-from common.audit import write_audit_entry_async
-from common.config import DATABASE_URL, INGEST_INTERVAL_SECONDS, ROLLING_MEDIAN_DAYS
+from common.audit import start_audit_batcher, stop_audit_batcher, write_audit_entry_nowait
+from common.config import (
+    INGEST_INTERVAL_SECONDS,
+    INGEST_POOL_MAX,
+    INGEST_POOL_MIN,
+    ROLLING_MEDIAN_DAYS,
+)
+from common.db import close_pool, get_pool
+from common.egress import aclose_egress_client
 from common.logging_util import get_logger
 from common.types import PricePoint
 
@@ -39,102 +48,188 @@ log = get_logger("pricing_ingestor")
 
 # ── DB helpers ────────────────────────────────────────────────────────────────
 
-async def insert_raw_price(pool: asyncpg.Pool, p: PricePoint) -> int:
-    """Insert a raw price and return the new row id."""
-    row = await pool.fetchrow(
-        """
-        INSERT INTO prices_raw (source, metal, venue, price_ts, value, currency, source_id)
-        VALUES ($1, $2, $3, $4, $5, $6, $7)
-        ON CONFLICT DO NOTHING
-        RETURNING id
-        """,
-        p.source, p.metal, p.venue, p.price_ts,
-        float(p.value), p.currency, p.source_id,
+_RAW_COLUMNS = ("id", "source", "metal", "venue", "price_ts", "value", "currency", "source_id")
+
+# Hot statements as module constants: asyncpg's per-connection statement cache
+# (POOL_STATEMENT_CACHE_SIZE) is keyed by SQL text, so every tick on a given
+# connection reuses the prepared plan instead of re-parsing.
+_SQL_RESERVE_RAW_IDS = (
+    "SELECT nextval(pg_get_serial_sequence('prices_raw', 'id')) AS id"
+    " FROM generate_series(1, $1)"
+)
+
+_SQL_PROMOTE = """
+    INSERT INTO prices_canonical (metal, price_ts, value, currency, source, raw_id)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    ON CONFLICT (metal, price_ts) DO UPDATE
+        SET value  = EXCLUDED.value,
+            source = EXCLUDED.source,
+            raw_id = EXCLUDED.raw_id,
+            promoted_at = NOW()
+"""
+
+# Window of prices_canonical_rolling_median_7d (006_canonical_rolling_median.sql)
+_MEDIAN_VIEW_DAYS = 7
+
+_SQL_ROLLING_MEDIANS = """
+    SELECT metal, median_value FROM prices_canonical_rolling_median_7d
+    WHERE metal = ANY($1::text[])
+"""
+
+
+async def insert_raw_prices(conn: asyncpg.Connection, prices: list[PricePoint]) -> list[int]:
+    """
+    Insert a tick's raw prices in bulk and return their ids, in order.
+
+    Ids are reserved from the prices_raw sequence up front so the rows can go
+    in with a single COPY (which cannot RETURNING); that is two round-trips
+    per tick regardless of how many prices it carries. Run inside the tick's
+    transaction (see ingest_tick).
+    """
+    if not prices:
+        return []
+    id_rows = await conn.fetch(_SQL_RESERVE_RAW_IDS, len(prices))
+    raw_ids = [r["id"] for r in id_rows]
+    await conn.copy_records_to_table(
+        "prices_raw",
+        records=[
+            (raw_id, p.source, p.metal, p.venue, p.price_ts,
+             p.value, p.currency, p.source_id)
+            for raw_id, p in zip(raw_ids, prices)
+        ],
+        columns=_RAW_COLUMNS,
     )
-    return row["id"] if row else -1
+    return raw_ids
 
 
-async def promote_to_canonical(pool: asyncpg.Pool, p: PricePoint, raw_id: int) -> None:
-    """Insert into prices_canonical (upsert by metal+price_ts)."""
-    await pool.execute(
-        """
-        INSERT INTO prices_canonical (metal, price_ts, value, currency, source, raw_id)
-        VALUES ($1, $2, $3, $4, $5, $6)
-        ON CONFLICT (metal, price_ts) DO UPDATE
-            SET value  = EXCLUDED.value,
-                source = EXCLUDED.source,
-                raw_id = EXCLUDED.raw_id,
-                promoted_at = NOW()
-        """,
-        p.metal, p.price_ts, float(p.value), p.currency, p.source, raw_id,
+async def promote_many(
+    conn: asyncpg.Connection, accepted_with_ids: list[tuple[PricePoint, int]]
+) -> None:
+    """
+    Upsert accepted prices into prices_canonical (by metal+price_ts).
+
+    executemany pipelines one prepared statement over all rows instead of a
+    round-trip per row. It runs the rows as separate statements, so two
+    accepted prices for the same metal+price_ts still resolve last-wins
+    (a single multi-row upsert would reject them instead).
+    """
+    if not accepted_with_ids:
+        return
+    await conn.executemany(
+        _SQL_PROMOTE,
+        [
+            (p.metal, p.price_ts, p.value, p.currency, p.source, raw_id)
+            for p, raw_id in accepted_with_ids
+        ],
     )
 
 
-async def get_historical_values(
-    pool: asyncpg.Pool, metal: str, days: int = ROLLING_MEDIAN_DAYS
-) -> list[float]:
-    """Fetch recent canonical prices for outlier detection."""
-    since = datetime.now(tz=timezone.utc) - timedelta(days=days)
-    rows = await pool.fetch(
-        """
-        SELECT value FROM prices_canonical
-        WHERE metal = $1 AND price_ts >= $2
-        ORDER BY price_ts
-        """,
-        metal, since,
+async def get_rolling_medians(pool: asyncpg.Pool, metals: list[str]) -> dict[str, float]:
+    """
+    Fetch each metal's precomputed rolling median for outlier detection.
+
+    Reads prices_canonical_rolling_median_7d (006_canonical_rolling_median.sql),
+    one row per metal. Metals with no recent canonical prices are absent.
+    """
+    rows = await pool.fetch(_SQL_ROLLING_MEDIANS, metals)
+    return {r["metal"]: r["median_value"] for r in rows}
+
+
+async def refresh_rolling_medians(pool: asyncpg.Pool) -> None:
+    """Recompute the rolling-median view (once per tick), without blocking readers."""
+    await pool.execute(
+        "REFRESH MATERIALIZED VIEW CONCURRENTLY prices_canonical_rolling_median_7d"
     )
-    return [float(r["value"]) for r in rows]
 
 
 # ── Core ingest tick ──────────────────────────────────────────────────────────
 
-async def ingest_tick(pool: asyncpg.Pool) -> None:
-    request_id = uuid.uuid4()
-    log.info("Ingest tick started request_id=%s", request_id)
+_ADAPTERS = [
+    ("metals_api", metals_api_adapter.fetch_prices),
+    ("lbma",       lbma_adapter.fetch_prices),
+]
 
-    # 1. Fetch from all adapters
-    all_prices: list[PricePoint] = []
-    for adapter_name, fetch_fn in [
-        ("metals_api", metals_api_adapter.fetch_prices),
-        ("lbma",       lbma_adapter.fetch_prices),
-    ]:
+# Caps concurrent outbound adapter calls as the adapter list grows.
+_ADAPTER_CONCURRENCY = asyncio.Semaphore(4)
+
+
+async def _fetch_adapter(adapter_name: str, fetch_fn) -> list[PricePoint]:
+    """Run one adapter; a failure is logged and yields no prices."""
+    async with _ADAPTER_CONCURRENCY:
         try:
             prices = await fetch_fn()
-            all_prices.extend(prices)
-            log.info("Adapter %s returned %d prices", adapter_name, len(prices))
         except Exception as exc:
             log.error("Adapter %s failed: %s", adapter_name, exc)
+            return []
+    log.info("Adapter %s returned %d prices", adapter_name, len(prices))
+    return prices
+
+
+# Metals seen on the previous tick. The slug set barely changes between
+# ticks, so their medians are prefetched while the adapters are still fetching.
+_LAST_METALS: set[str] = set()
+
+
+async def ingest_tick(pool: asyncpg.Pool) -> None:
+    global _LAST_METALS
+    request_id = uuid.uuid4()
+    log.info("Ingest tick started request_id=%s", request_id)
+
+    # 1. Fetch from all adapters concurrently (tick takes max, not sum),
+    #    overlapped with the median prefetch for last tick's metals
+    prefetched = list(_LAST_METALS)
+    async with asyncio.TaskGroup() as tg:
+        medians_task = (
+            tg.create_task(get_rolling_medians(pool, prefetched)) if prefetched else None
+        )
+        tasks = [
+            tg.create_task(_fetch_adapter(name, fetch_fn))
+            for name, fetch_fn in _ADAPTERS
+        ]
+    all_prices: list[PricePoint] = []
+    for task in tasks:
+        all_prices.extend(task.result())
 
     if not all_prices:
         log.warning("No prices fetched this tick")
+        await refresh_rolling_medians(pool)   # keep the 7-day window sliding
         return
 
-    # 2. Build historical lookup for outlier detection
-    metals = {p.metal for p in all_prices}
-    historical: dict[str, list[float]] = {}
-    for metal in metals:
-        historical[metal] = await get_historical_values(pool, metal)
+    # 2. Look up rolling medians for outlier detection (only metals that
+    #    were not prefetched need another query)
+    metals  = {p.metal for p in all_prices}
+    medians = medians_task.result() if medians_task else {}
+    missing = metals.difference(prefetched)
+    if missing:
+        medians.update(await get_rolling_medians(pool, list(missing)))
+    _LAST_METALS = metals
 
     # 3. Normalize
-    result = normalize(all_prices, historical)
-
-    # 4. Store raw + promote canonical
-    promoted = 0
-    for price in all_prices:
-        raw_id = await insert_raw_price(pool, price)
-
-        if any(p is price for p in result.accepted):
-            if raw_id > 0:
-                await promote_to_canonical(pool, price, raw_id)
-                promoted += 1
+    result = normalize(all_prices, {}, medians=medians)
+
+    # 4. Store raw + promote canonical in one transaction (one commit per tick)
+    accepted_ids = {id(p) for p in result.accepted}
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            raw_ids = await insert_raw_prices(conn, all_prices)
+            accepted_with_ids = [
+                (price, raw_id)
+                for price, raw_id in zip(all_prices, raw_ids)
+                if id(price) in accepted_ids
+            ]
+            await promote_many(conn, accepted_with_ids)
+    promoted = len(accepted_with_ids)
+    # Every tick, not only when something was promoted: if a metal's prices
+    # are all rejected, its window must still slide or the median never moves
+    await refresh_rolling_medians(pool)
 
     log.info(
         "Tick complete: %d raw stored, %d promoted, %d rejected",
         len(all_prices), promoted, len(result.rejected),
     )
 
-    # 5. Audit log
-    await write_audit_entry_async(
+    # 5. Audit log (queued; the flusher writes it off the tick path)
+    await write_audit_entry_nowait(
         pool,
         request_id=request_id,
         actor="pricing_ingestor",
@@ -150,24 +245,53 @@ async def ingest_tick(pool: asyncpg.Pool) -> None:
 
 # ── Main loop ─────────────────────────────────────────────────────────────────
 
+# How long startup keeps retrying the database before giving up
+_DB_CONNECT_BUDGET_S = 60
+
+
 async def main() -> None:
     log.info(
         "Pricing ingestor starting — interval=%ds", INGEST_INTERVAL_SECONDS
     )
 
-    # Retry loop for DB connection (container startup race)
-    for attempt in range(10):
+    # Outlier medians come from a view with a fixed window; refuse to run
+    # rather than silently ignore a different ROLLING_MEDIAN_DAYS.
+    if ROLLING_MEDIAN_DAYS != _MEDIAN_VIEW_DAYS:
+        log.error(
+            "ROLLING_MEDIAN_DAYS=%d is not supported: the rolling-median view "
+            "covers %d days (db/migrations/006_canonical_rolling_median.sql). Exiting.",
+            ROLLING_MEDIAN_DAYS, _MEDIAN_VIEW_DAYS,
+        )
+        sys.exit(1)
+
+    # Retry loop for DB connection (container startup race): exponential
+    # backoff with jitter, bounded by wall-clock rather than attempt count
+    deadline = time.monotonic() + _DB_CONNECT_BUDGET_S
+    attempt  = 0
+    while True:
         try:
-            pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=5)
+            pool = await get_pool(
+                min_size        = INGEST_POOL_MIN,
+                max_size        = INGEST_POOL_MAX,
+                command_timeout = 30,
+                # JIT warm-up costs more than it saves on the tick's small queries
+                server_settings = {"application_name": "pricing_ingestor", "jit": "off"},
+            )
             log.info("Connected to database")
             break
         except Exception as exc:
-            log.warning("DB connection attempt %d failed: %s", attempt + 1, exc)
-            await asyncio.sleep(3)
-    else:
-        log.error("Could not connect to database after 10 attempts. Exiting.")
-        sys.exit(1)
-
+            attempt += 1
+            log.warning("DB connection attempt %d failed: %s", attempt, exc)
+            delay = min(30.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.5)
+            if time.monotonic() + delay > deadline:
+                log.error(
+                    "Could not connect to database after %d attempts (%ds). Exiting.",
+                    attempt, _DB_CONNECT_BUDGET_S,
+                )
+                sys.exit(1)
+            await asyncio.sleep(delay)
+
+    start_audit_batcher(pool)
     try:
         while True:
             try:
@@ -176,8 +300,18 @@ async def main() -> None:
                 log.exception("Ingest tick error: %s", exc)
             await asyncio.sleep(INGEST_INTERVAL_SECONDS)
     finally:
-        await pool.close()
+        await stop_audit_batcher()   # drain queued audit rows before the pool closes
+        await aclose_egress_client()
+        await close_pool()
 
 
 if __name__ == "__main__":
+    # uvloop (installed with uvicorn[standard]) cuts per-await loop overhead;
+    # fall back to the stock loop where it is unavailable.
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
@@ -8,18 +8,24 @@ Responsibilities:
   4. Promote valid, highest-priority price for each (metal, timestamp) to
      prices_canonical via DB writer.
 
-The rolling median is computed over prices_raw for the past ROLLING_MEDIAN_DAYS.
+The rolling median covers the past ROLLING_MEDIAN_DAYS; the ingestor reads it
+precomputed from prices_canonical_rolling_median_7d.
 """
 
 from __future__ import annotations
 
+import logging
 import os
 import sys
+from collections import defaultdict
 from decimal import Decimal
-from statistics import median
-from typing import List, Optional, Sequence, Tuple
+from typing import List, Optional, Sequence, Tuple, Union
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
+import numpy as np
+
+_PACKAGES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "packages"))
+if _PACKAGES not in sys.path:
+    sys.path.insert(0, _PACKAGES)
 
 from common.config import (
     METAL_SOURCE_PREFERENCE,
@@ -39,11 +45,12 @@ def compute_rolling_median(historical_values: Sequence[float]) -> Optional[float
     """Return the median of `historical_values`, or None if empty."""
     if not historical_values:
         return None
-    return float(median(historical_values))
+    # np.median partitions rather than fully sorting the window
+    return float(np.median(np.asarray(historical_values, dtype=np.float64)))
 
 
 def is_outlier(
-    value: Decimal,
+    value: Union[Decimal, float],
     historical_values: Sequence[float],
     multiplier: float = OUTLIER_MULTIPLIER,
 ) -> bool:
@@ -63,9 +70,25 @@ def is_outlier(
 
 # ── Source priority resolution ────────────────────────────────────────────────
 
+_priority_get = SOURCE_PRIORITY.get
+
+
+def _source_priority(p: PricePoint) -> int:
+    """Sort key: the price's SOURCE_PRIORITY (999 for unknown sources)."""
+    return _priority_get(p.source, 999)
+
+
 def sort_by_priority(prices: List[PricePoint]) -> List[PricePoint]:
     """Sort a list of PricePoint by source priority (ascending = higher priority)."""
-    return sorted(prices, key=lambda p: SOURCE_PRIORITY.get(p.source, 999))
+    return sorted(prices, key=_source_priority)
+
+
+# metal → {source: position in METAL_SOURCE_PREFERENCE}, so the best preferred
+# price is found in one pass over the candidates
+_PREFERENCE_RANK: dict[str, dict[str, int]] = {
+    metal: {source: i for i, source in enumerate(sources)}
+    for metal, sources in METAL_SOURCE_PREFERENCE.items()
+}
 
 
 def select_best_price(
@@ -80,14 +103,18 @@ def select_best_price(
     if not prices:
         return None
 
-    preference = METAL_SOURCE_PREFERENCE.get(metal, [])
-    for preferred_source in preference:
-        for p in prices:
-            if p.source == preferred_source:
-                return p
+    rank = _PREFERENCE_RANK.get(metal)
+    if rank:
+        best = min(
+            (p for p in prices if p.source in rank),
+            key=lambda p: rank[p.source],
+            default=None,
+        )
+        if best is not None:
+            return best
 
-    # Fall back to global priority sort
-    return sort_by_priority(prices)[0]
+    # Fall back to global priority (min, not a full sort: only the first is used)
+    return min(prices, key=_source_priority)
 
 
 # ── Main normalizer ───────────────────────────────────────────────────────────
@@ -101,10 +128,13 @@ class NormalizationResult:
 
     def accept(self, price: PricePoint) -> None:
         self.accepted.append(price)
-        log.debug(
-            "ACCEPTED %s %s from %s value=%s",
-            price.metal, price.price_ts, price.source, price.value,
-        )
+        # Called for nearly every price each tick; skip building the call's
+        # argument tuple unless DEBUG is actually on.
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "ACCEPTED %s %s from %s value=%s",
+                price.metal, price.price_ts, price.source, price.value,
+            )
 
     def reject(self, price: PricePoint, reason: str) -> None:
         self.rejected.append((price, reason))
@@ -125,6 +155,8 @@ def normalize(
     incoming: List[PricePoint],
     historical_lookup: dict,          # {metal: [float, ...]} — recent values
     multiplier: float = OUTLIER_MULTIPLIER,
+    *,
+    medians: Optional[dict] = None,   # {metal: float} — precomputed rolling medians
 ) -> NormalizationResult:
     """
     Normalise a batch of incoming PricePoints.
@@ -134,6 +166,10 @@ def normalize(
         historical_lookup:  Dict mapping metal → list of recent float values
                             (from prices_raw, last ROLLING_MEDIAN_DAYS days).
         multiplier:         Outlier threshold multiplier (default: 3.0).
+        medians:            Optional dict mapping metal → rolling median, e.g.
+                            from the DB-side materialized view. When given it
+                            is used instead of historical_lookup; a metal
+                            missing from it has no history.
 
     Returns:
         NormalizationResult with .accepted and .rejected lists.
@@ -142,17 +178,24 @@ def normalize(
     result = NormalizationResult()
 
     # Group by metal so we can apply priority selection per metal
-    by_metal: dict[str, List[PricePoint]] = {}
+    by_metal: defaultdict[str, List[PricePoint]] = defaultdict(list)
     for p in incoming:
-        by_metal.setdefault(p.metal, []).append(p)
+        by_metal[p.metal].append(p)
 
     for metal, candidates in by_metal.items():
         history = historical_lookup.get(metal, [])
+        if medians is not None:
+            med = medians.get(metal)
+        else:
+            med = compute_rolling_median(history)   # once per metal, not per candidate
+        # is_outlier()'s rule with the threshold worked out once per metal;
+        # no history (or a zero median) accepts everything.
+        threshold = multiplier * med if med else None
 
         for price in candidates:
             # 1. Outlier check
-            if is_outlier(price.value, history, multiplier):
-                result.reject(price, f"outlier: value={price.value} > {multiplier}×median={compute_rolling_median(history):.4f}")
+            if threshold is not None and price.value_f > threshold:
+                result.reject(price, f"outlier: value={price.value} > {multiplier}×median={med:.4f}")
                 continue
 
             # 2. Accept
@@ -12,6 +12,8 @@ Updated: Uses scrap metal slugs (CU_BARE, HMS1, etc.) instead of precious metals
 
 from __future__ import annotations
 
+import copy
+import dataclasses
 import os
 import sys
 from decimal import Decimal
@@ -23,7 +25,7 @@ import pytest
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "packages"))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from normalizer import is_outlier, normalize, compute_rolling_median
+from normalizer import is_outlier, normalize, compute_rolling_median, select_best_price
 from common.types import PricePoint
 
 
@@ -45,6 +47,27 @@ def make_price(
     )
 
 
+# ── Unit tests: PricePoint.value_f ────────────────────────────────────────────
+
+class TestPricePointValueF:
+    def test_value_f_matches_value_and_is_not_a_field(self):
+        """value_f is derived from value and stays out of fields()/asdict()."""
+        p = make_price(3.85)
+        assert p.value_f == 3.85
+        assert "value_f" not in {f.name for f in dataclasses.fields(p)}
+        assert "value_f" not in dataclasses.asdict(p)
+
+    def test_value_cannot_be_reassigned(self):
+        """Frozen: value_f can never go stale behind a mutated value."""
+        p = make_price(3.85)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            p.value = Decimal("99")
+
+    def test_copy_keeps_value_f(self):
+        p = make_price(3.85)
+        assert copy.copy(p).value_f == 3.85
+
+
 # ── Unit tests: is_outlier() ──────────────────────────────────────────────────
 
 class TestIsOutlier:
@@ -107,6 +130,13 @@ class TestIsOutlier:
         assert not is_outlier(Decimal("7.59"), history, multiplier=2.0)
         assert is_outlier(Decimal("7.61"), history, multiplier=2.0)
 
+    def test_even_length_history_uses_middle_pair(self):
+        """Even-length history: median is the mean of the middle pair."""
+        history = [3.80, 3.85, 3.90, 3.82, 3.78, 3.88]
+        assert compute_rolling_median(history) == pytest.approx(3.835)
+        assert not is_outlier(Decimal("11.50"), history)   # 3 × 3.835 = 11.505
+        assert is_outlier(Decimal("11.51"), history)
+
 
 # ── Integration tests: normalize() ───────────────────────────────────────────
 
@@ -163,6 +193,15 @@ class TestNormalize:
         price, reason = result.rejected[0]
         assert "outlier" in reason.lower()
 
+    def test_precomputed_medians_used(self):
+        """DB-side medians replace the history lists; missing metals have no history."""
+        normal  = make_price(3.90, "CU_BARE")
+        outlier = make_price(15.00, "CU_BARE", "iscrap")
+        fresh   = make_price(999.0, "ZORBA")          # not in medians → accepted
+        result  = normalize([normal, outlier, fresh], {}, medians={"CU_BARE": 3.83})
+        assert [p.value for p in result.accepted] == [Decimal("3.90"), Decimal("999.0")]
+        assert result.rejected[0][0].value == Decimal("15.00")
+
     def test_no_history_accepts_all(self):
         """With empty history, all prices should be accepted."""
         prices = [
@@ -217,3 +256,28 @@ class TestNormalize:
         result = normalize(prices, {})
         assert len(result.accepted) == len(typical_prices)
         assert len(result.rejected) == 0
+
+
+# ── Unit tests: select_best_price() ──────────────────────────────────────────
+
+class TestSelectBestPrice:
+    def test_metal_preference_wins_over_list_order(self):
+        """CU_BARE prefers iscrap over scrap_register regardless of input order."""
+        register = make_price(3.80, "CU_BARE", "scrap_register")
+        iscrap   = make_price(3.85, "CU_BARE", "iscrap")
+        assert select_best_price([register, iscrap], "CU_BARE") is iscrap
+
+    def test_first_of_equal_preference_kept(self):
+        """Two prices from the same preferred source → the first one is returned."""
+        first  = make_price(3.85, "CU_BARE", "iscrap")
+        second = make_price(3.90, "CU_BARE", "iscrap")
+        assert select_best_price([first, second], "CU_BARE") is first
+
+    def test_falls_back_to_global_priority(self):
+        """No preferred source present → lowest SOURCE_PRIORITY wins."""
+        seed     = make_price(3.85, "CU_BARE", "seed")
+        fastmkts = make_price(3.90, "CU_BARE", "recycling_today")
+        assert select_best_price([seed, fastmkts], "CU_BARE") is fastmkts
+
+    def test_empty_returns_none(self):
+        assert select_best_price([], "CU_BARE") is None